@@ -1,13 +1,16 @@
 import requests
+import hashlib
 import json
 import os
+import threading
 from collections import Counter, defaultdict
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 import re
-import pycountry
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 import time
+from disk_cache import load_json, save_json
+from gazetteer import load_gazetteer, phrase_key, tokenize_location
 
 # US state codes mapping
 US_STATES = {
@@ -59,14 +62,10 @@ INTERNATIONAL_CITIES = {
     'Taipei': 'Taiwan, Province of China'
 }
 
-# Cache for country lookups
-@lru_cache(maxsize=1000)
 def get_country_from_name(name: str) -> str:
-    """Cached function to get country name from pycountry"""
-    try:
-        return pycountry.countries.search_fuzzy(name)[0].name
-    except (LookupError, IndexError):
-        return 'Unknown'
+    """Look up a country, alias or subdivision name in the gazetteer"""
+    key = phrase_key(name)
+    return GAZETTEER['countries'].get(key) or GAZETTEER['subdivisions'].get(key) or 'Unknown'
 
 # def load_companies() -> Dict[str, str]:
 #     """Load companies from config file"""
@@ -177,87 +176,246 @@ def get_country_from_name(name: str) -> str:
 #     print(f"Total jobs analyzed: {total_jobs}")
 #     print(f"Jobs with US state codes: {total_state_matches} ({total_state_matches/total_jobs*100:.1f}%)")
 
+# Nicknames of places, matched like country names; country aliases belong in build_gazetteer.py
+RUNTIME_COUNTRY_ALIASES = {
+    'Bay Area': 'United States',
+    'SF': 'United States',
+    'NYC': 'United States',
+}
+
+# Countries, subdivisions and major cities, generated by build_gazetteer.py
+GAZETTEER = load_gazetteer()
+
+def _word_tuple(key: str) -> tuple:
+    return tuple(key.split(' '))
+
+# City index priority of gazetteer cities, below every US and international city
+GAZETTEER_CITY_PRIORITY = len(INTERNATIONAL_CITIES) + 1
+
+def build_location_indexes():
+    """Index the location tables and gazetteer by lowercased word tuple
+
+    Returns (city index, country index, subdivision index, country codes,
+    longest phrase length). City index values are (priority, country) so
+    that, as in the old linear scans, any US city beats international cities,
+    international cities win in INTERNATIONAL_CITIES order, and both beat
+    gazetteer cities. Country codes are matched in upper case only, like
+    US_STATES.
+    """
+    cities = {_word_tuple(phrase_key(city)): (0, 'United States') for city in US_CITIES}
+    for priority, (city, country) in enumerate(INTERNATIONAL_CITIES.items(), start=1):
+        cities.setdefault(_word_tuple(phrase_key(city)), (priority, country))
+    for city, country in GAZETTEER['cities'].items():
+        cities.setdefault(_word_tuple(city), (GAZETTEER_CITY_PRIORITY, country))
+
+    countries = {_word_tuple(name): country for name, country in GAZETTEER['countries'].items()}
+    for alias, country in RUNTIME_COUNTRY_ALIASES.items():
+        countries[_word_tuple(phrase_key(alias))] = country
+    subdivisions = {_word_tuple(name): country for name, country in GAZETTEER['subdivisions'].items()}
+
+    longest = max(len(key) for key in list(cities) + list(countries) + list(subdivisions))
+    return cities, countries, subdivisions, GAZETTEER['codes'], longest
+
+CITY_INDEX, COUNTRY_INDEX, SUBDIVISION_INDEX, COUNTRY_CODES, MAX_PHRASE_WORDS = build_location_indexes()
+
+# Bump when resolution logic changes without a table change
+RESOLVER_VERSION = '5'
+
+LOCATION_CACHE_FILE = 'location_cache.json'
+
+# Resolved location strings kept on disk; the least recently used are dropped first
+LOCATION_CACHE_SIZE = int(os.getenv('LOCATION_CACHE_SIZE', '50000'))
+
+def location_tables_fingerprint() -> str:
+    """Hash of everything a resolution depends on; any edit invalidates the disk cache"""
+    tables = {
+        'resolver': RESOLVER_VERSION,
+        'states': sorted(US_STATES),
+        'us_cities': sorted(US_CITIES),
+        'international_cities': INTERNATIONAL_CITIES,
+        'aliases': RUNTIME_COUNTRY_ALIASES,
+        'gazetteer': GAZETTEER['version'],
+    }
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+_location_cache: Optional[Dict[str, str]] = None
+_location_cache_lock = threading.Lock()
+
 def identify_single_country(location: str) -> str:
-    """Helper function to identify country for a single location"""
-    # First check for US state codes
-    if any(state in location for state in US_STATES):
-        return 'United States'
-    
-    # Check for common US city patterns
-    if any(city in location for city in US_CITIES):
-        return 'United States'
-    
-    # Check for international cities
-    for city, country in INTERNATIONAL_CITIES.items():
-        if city in location:
-            return country
-    
-    # Split location into parts and try to find country in each part
-    parts = [part.strip() for part in location.split(',')]
-    
-    # Try to find country in each part, starting from the end (most common format)
-    for part in reversed(parts):
-        country = get_country_from_name(part)
-        if country != 'Unknown':
+    """Helper function to identify country for a single location
+
+    Results, including 'Unknown', are cached by the raw location string in
+    memory and on disk (see save_location_cache), so each distinct string is
+    resolved once across runs until the location tables change.
+    """
+    global _location_cache
+    with _location_cache_lock:
+        if _location_cache is None:
+            _location_cache = load_json(LOCATION_CACHE_FILE, location_tables_fingerprint())
+        country = _location_cache.pop(location, None)
+        if country is not None:
+            # Re-inserting keeps the cache ordered from least to most recently used
+            _location_cache[location] = country
             return country
-            
-    # If no country found, check for common variations
-    location_lower = location.lower()
-    if 'united states' in location_lower or 'usa' in location_lower or 'u.s.' in location_lower:
-        return 'United States'
-    if 'united kingdom' in location_lower or 'uk' in location_lower or 'england' in location_lower:
-        return 'United Kingdom'
-    if 'bay area' in location_lower or 'sf' in location_lower:
+
+    country = resolve_single_country(location)
+    with _location_cache_lock:
+        _location_cache[location] = country
+    return country
+
+def save_location_cache() -> None:
+    """Persist the most recently used location resolutions for the next run"""
+    with _location_cache_lock:
+        if _location_cache is None:
+            return
+        entries = list(_location_cache.items())[-LOCATION_CACHE_SIZE:]
+        save_json(LOCATION_CACHE_FILE, dict(entries), location_tables_fingerprint())
+
+# Upper-case words that name regions, not the countries sharing their ISO code ("NA" is Namibia)
+REGION_ABBREVIATIONS = {'NA', 'EU', 'EMEA', 'APAC', 'LATAM', 'AMER', 'ANZ'}
+
+def phrase_matches(lowered: List[str]) -> Dict[str, List[Tuple[int, object]]]:
+    """(start, value) of the city, country and subdivision phrases in a location, by index
+
+    Every phrase found in any index is a candidate, and the longest win:
+    a word that belongs to an accepted phrase can't be matched again by a
+    shorter one, so "New Jersey" is a subdivision and never the country
+    Jersey, and "New South Wales" never matches Wales.
+    """
+    indexes = (('city', CITY_INDEX), ('country', COUNTRY_INDEX), ('subdivision', SUBDIVISION_INDEX))
+    candidates = []
+    for start in range(len(lowered)):
+        for length in range(1, min(MAX_PHRASE_WORDS, len(lowered) - start) + 1):
+            key = tuple(lowered[start:start + length])
+            hits = [(kind, index[key]) for kind, index in indexes if key in index]
+            if hits:
+                candidates.append((-length, start, hits))
+
+    matches: Dict[str, List[Tuple[int, object]]] = {'city': [], 'country': [], 'subdivision': []}
+    taken = set()
+    for negative_length, start, hits in sorted(candidates, key=lambda candidate: candidate[:2]):
+        span = set(range(start, start - negative_length))
+        if span & taken:
+            continue
+        taken |= span
+        for kind, value in hits:
+            matches[kind].append((start, value))
+    return matches
+
+def trailing_country_code(location: str) -> Optional[str]:
+    """Country of an upper-case ISO code forming the whole last comma-separated part ("Zurich, CH")"""
+    words = tokenize_location(location.rsplit(',', 1)[-1])
+    if len(words) == 1 and words[0] not in REGION_ABBREVIATIONS:
+        return COUNTRY_CODES.get(words[0])
+    return None
+
+def resolve_single_country(location: str) -> str:
+    """Resolve the country of a single location, without caching
+
+    Tokenizes the location once and looks each word and phrase up in the
+    prebuilt indexes, keeping the longest phrases (see phrase_matches): US
+    state codes, unless the location ends in a country code naming the same
+    country as one of its cities ("Berlin, DE", "Toronto, CA"), then US and
+    international cities, then country names and
+    aliases, regions such as "Ontario" or "Karnataka", gazetteer cities and
+    finally a trailing country code. Gazetteer cities come after countries
+    and regions because many names exist in several countries, as in
+    "Cambridge, Massachusetts". Among countries and among regions the
+    rightmost match wins, as the country usually comes last.
+    """
+    words = tokenize_location(location)
+    lowered = [word.lower() for word in words]
+    matches = phrase_matches(lowered)
+
+    # First check for US state codes
+    if any(word in US_STATES for word in words):
+        code = trailing_country_code(location)
+        if code and code in {country for _, (_, country) in matches['city']}:
+            return code
         return 'United States'
-    if 'remote' in location_lower:
+
+    # Check for US and international cities
+    cities = sorted(city for _, city in matches['city'])
+    if cities and cities[0][0] < GAZETTEER_CITY_PRIORITY:
+        return cities[0][1]
+
+    # Check for country names and aliases, then regions
+    for kind in ('country', 'subdivision'):
+        if matches[kind]:
+            return max(matches[kind])[1]
+
+    # Check for gazetteer cities
+    if cities:
+        return cities[0][1]
+
+    code = trailing_country_code(location)
+    if code:
+        return code
+
+    if 'remote' in lowered:
         return 'Remote'
-        
+
     return 'Unknown'
 
-def identify_country(location: str) -> str:
-    """Identify the country from a location string using pycountry"""
-    if location == 'N/A':
-        return location
-        
-    # Handle multiple locations (separated by semicolons)
-    if ';' in location:
-        locations = [loc.strip() for loc in location.split(';')]
-        # Get countries for all locations
-        countries = set()  # Using set to automatically handle duplicates
-        for loc in locations:
-            # Check if location contains both Remote and country info
-            if 'remote' in loc.lower():
-                countries.add('Remote')
-                # Remove 'remote' from the string to check for country
-                loc = re.sub(r'remote,?\s*', '', loc, flags=re.IGNORECASE).strip()
-                if loc:
-                    country = identify_single_country(loc)
-                    if country != 'Unknown':
-                        countries.add(country)
-            else:
-                country = identify_single_country(loc)
-                if country != 'Unknown':
-                    countries.add(country)
-        
-        if countries:
-            return '; '.join(sorted(countries))
-        return 'Unknown'
-    
-    # Handle single location with Remote
-    if 'remote' in location.lower():
-        countries = set()  # Using set to automatically handle duplicates
-        countries.add('Remote')
-        # Remove 'remote' from the string to check for country
-        loc = re.sub(r'remote,?\s*', '', location, flags=re.IGNORECASE).strip()
-        if loc:
-            country = identify_single_country(loc)
-            if country != 'Unknown':
+# Strips the word "remote" (and a trailing comma) so the rest can be resolved
+_REMOTE_RE = re.compile(r'remote,?\s*', re.IGNORECASE)
+
+# Separators between places named in one part ("US/Canada", "London & Berlin")
+_PLACE_SEPARATOR_RE = re.compile(r'\s*[/&]\s*')
+
+def resolve_place(place: str) -> Tuple[str, bool]:
+    """(country, is_remote) of one place, with an empty country for a place that only says it is remote"""
+    if 'remote' not in place.lower():
+        return identify_single_country(place), False
+    place = _REMOTE_RE.sub('', place).strip()
+    return (identify_single_country(place) if place else ''), True
+
+# Distinct raw location strings whose normalization is kept in memory
+LOCATION_MEMO_SIZE = int(os.getenv('LOCATION_MEMO_SIZE', '20000'))
+
+@lru_cache(maxsize=LOCATION_MEMO_SIZE)
+def normalize_location(raw: str) -> Tuple[Tuple[str, ...], bool]:
+    """Parse a job board location into (sorted countries, is_remote)
+
+    Multiple locations are separated by semicolons. A part naming several
+    places with '/' or '&' resolves to all of their countries when every
+    place resolves, and is read as one name otherwise ("Trinidad & Tobago").
+    A place mentioning "remote" marks the job remote and the rest of it, if
+    any, is still resolved. Unresolvable parts are dropped, and 'N/A' is
+    kept as is.
+    Memoized by the raw string, so repeated locations cost a dict lookup.
+    """
+    if not raw:
+        return (), False
+
+    countries: Set[str] = set()
+    is_remote = False
+    for part in raw.split(';'):
+        part = part.strip()
+        if part == 'N/A':
+            countries.add(part)
+            continue
+        places = [resolve_place(place) for place in _PLACE_SEPARATOR_RE.split(part)]
+        if len(places) > 1 and any(country == 'Unknown' for country, _ in places):
+            places = [resolve_place(part)]
+        for country, place_is_remote in places:
+            is_remote = is_remote or place_is_remote
+            if country and country != 'Unknown':
                 countries.add(country)
-        return '; '.join(sorted(countries))
-    
-    # Handle single location without Remote
-    country = identify_single_country(location)
-    return country if country != 'Unknown' else 'Unknown'
+    return tuple(sorted(countries)), is_remote
+
+def location_countries(location: str) -> List[str]:
+    """Sorted countries of a location string, with 'Remote' among them for remote jobs"""
+    countries, is_remote = normalize_location(location)
+    return sorted(countries + ('Remote',)) if is_remote else list(countries)
+
+def job_countries(location: str) -> Dict[str, str]:
+    """The 'countries' field of a job: location_countries() as a map with numeric indices"""
+    return {str(i): country for i, country in enumerate(location_countries(location))}
+
+def identify_country(location: str) -> str:
+    """Identify the countries of a location string, joined by '; ', or 'Unknown'"""
+    return '; '.join(location_countries(location)) or 'Unknown'
 
 if __name__ == "__main__":
     pass  # No main function needed as this is a utility module 
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Benchmark title classification against the previous substring classifiers.
+
+Run with `python benchmark_titles.py`. Prints the per-title cost of the old
+substring experience-level check and of the token-based one, and lists the
+titles where the two disagree (the old check's false positives, such as
+'intern' inside "International").
+"""
+import timeit
+from collections import Counter
+
+from title_classifier import classify_titles, get_experience_level
+
+# Titles as they appear on Greenhouse, Ashby and Lever boards, weighted by how
+# often each shape shows up in a day's scrape
+TITLE_CORPUS = [
+    ('Software Engineer', 40), ('Senior Software Engineer', 35), ('Staff Software Engineer', 12),
+    ('Software Engineer II', 10), ('Software Engineer, Backend', 10), ('Senior Backend Engineer', 8),
+    ('Frontend Engineer', 6), ('Sr. Software Engineer, Payments', 6), ('Sr Software Engineer', 4),
+    ('Principal Software Engineer', 4), ('Software Engineer - New Grad', 4), ('Software Engineer Intern', 6),
+    ('Software Engineering Intern (Summer 2026)', 4), ('Engineering Manager, Platform', 5),
+    ('Software Engineering Manager', 3), ('Full Stack Engineer', 5), ('Site Reliability Engineer', 4),
+    ('Senior DevOps Engineer', 3), ('Machine Learning Engineer', 5), ('Senior ML Engineer', 3),
+    ('AI Engineer', 3), ('Data Engineer', 6), ('Senior Data Engineer', 5), ('Analytics Engineer', 3),
+    ('Data Analyst', 6), ('Senior Data Analyst', 4), ('Product Analyst', 3), ('Business Analyst', 3),
+    ('Data Scientist', 5), ('Senior Data Scientist, Growth', 3), ('Data Science Intern', 2),
+    ('Product Manager', 10), ('Senior Product Manager', 8), ('Group Product Manager', 3),
+    ('Principal Product Manager', 2), ('Associate Product Manager', 3), ('Technical Program Manager', 4),
+    ('Senior Technical Program Manager', 3), ('Program Manager, International Expansion', 2),
+    ('Product Designer', 5), ('Senior Product Designer', 4), ('UX Researcher', 2), ('Lead UX Designer', 2),
+    ('Account Executive', 25), ('Senior Account Executive', 12), ('Enterprise Account Executive', 10),
+    ('Sales Development Representative', 15), ('Business Development Representative', 8),
+    ('Customer Success Manager', 12), ('Solutions Engineer', 8), ('Solutions Architect', 6),
+    ('Recruiter', 6), ('Technical Recruiter', 5), ('Senior Recruiter', 4), ('Recruiting Coordinator', 3),
+    ('Executive Assistant', 3), ('Office Manager', 2), ('Financial Analyst', 4), ('Senior Accountant', 3),
+    ('Staff Accountant', 2), ('Tax Manager', 2), ('Legal Counsel', 2), ('Paralegal', 1),
+    ('Director of Engineering', 3), ('Director, Product Marketing', 2), ('VP of Sales', 2),
+    ('Vice President, Finance', 1), ('Head of Security', 2), ('Chief of Staff', 1),
+    ('Marketing Manager', 5), ('Product Marketing Manager', 4), ('Growth Marketing Lead', 2),
+    ('Content Strategist', 2), ('Community Manager', 2), ('Support Engineer', 4),
+    ('Customer Support Specialist', 6), ('Technical Support Engineer, Tier 2', 3),
+    ('Security Engineer', 4), ('Internal Tools Engineer', 2), ('IT Support Technician', 2),
+    ('Network Engineer', 2), ('VPN Infrastructure Engineer', 1), ('Hardware Engineer', 3),
+    ('Mechanical Engineer', 3), ('Manufacturing Technician', 3), ('Warehouse Associate', 4),
+    ('Operations Manager', 4), ('Operations Associate', 3), ('Early Career Program - Operations', 1),
+    ('Graduate Software Engineer', 2), ('Junior Data Analyst', 2), ('Jr. Web Developer', 1),
+    ('Co-op, Software Engineering', 2), ('Apprentice Electrician', 1), ('Student Researcher', 1),
+    ('Research Fellow', 1), ('Trainee Underwriter', 1), ('Payments Group Engineer', 1),
+    ('Headquarters Facilities Coordinator', 1), ('Mobile Engineer (iOS)', 3), ('Android Engineer', 2),
+]
+
+def legacy_experience_level(title):
+    """Substring classifier that title_classifier.get_experience_level replaced"""
+    if not title:
+        return 'unknown'
+    title_lower = title.lower()
+    senior_keywords = {
+        'senior', 'lead', 'principal', 'staff', 'sr.', 'head', 'chief',
+        'director', 'vp', 'vice president', 'senior manager', 'lead manager',
+        'principal manager', 'staff manager', 'head manager', 'group', 'engineering manager',
+    }
+    junior_keywords = {
+        'junior', 'entry', 'associate', 'jr.', 'assistant',
+        'graduate', 'new grad', 'new graduate', 'entry level',
+        'entry-level', 'early career', 'early-career'
+    }
+    intern_keywords = {
+        'intern', 'internship', 'co-op', 'coop', 'student', 'apprentice',
+        'trainee', 'fellowship', 'fellow'
+    }
+    if any(keyword in title_lower for keyword in senior_keywords):
+        return 'senior'
+    if any(keyword in title_lower for keyword in intern_keywords):
+        return 'intern'
+    if any(keyword in title_lower for keyword in junior_keywords):
+        return 'junior'
+    return 'mid-level'
+
+def per_title_microseconds(classify, titles, repeat=5):
+    seconds = min(timeit.repeat(lambda: [classify(title) for title in titles], number=1, repeat=repeat))
+    return seconds / len(titles) * 1e6
+
+if __name__ == "__main__":
+    titles = [title for title, weight in TITLE_CORPUS for _ in range(weight)] * 20
+    print(f"Corpus: {len(titles)} titles ({len(TITLE_CORPUS)} distinct)")
+
+    legacy = per_title_microseconds(legacy_experience_level, titles)
+    tokenized = per_title_microseconds(get_experience_level, titles)
+    print(f"Substring experience level: {legacy:.2f} us/title")
+    print(f"Token experience level:     {tokenized:.2f} us/title ({tokenized / legacy:.0%} of substring)")
+
+    batch = min(timeit.repeat(lambda: classify_titles(titles), number=1, repeat=5)) / len(titles) * 1e6
+    print(f"classify_titles (memoized role + level): {batch:.2f} us/title")
+
+    changes = Counter(
+        (title, legacy_experience_level(title), get_experience_level(title))
+        for title, _ in TITLE_CORPUS
+        if legacy_experience_level(title) != get_experience_level(title)
+    )
+    print(f"\n{len(changes)} distinct titles classified differently:")
+    for title, old, new in sorted(changes):
+        print(f"  {title!r}: {old} -> {new}")
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from disk_cache import load_json, save_json
+
+HEALTH_FILE = 'board_health.json'
+HEALTH_VERSION = '1'
+
+# Consecutive failed runs before a board is quarantined
+QUARANTINE_AFTER = int(os.getenv('BOARD_QUARANTINE_AFTER', '3'))
+
+# First re-probe interval once quarantined; doubles with each further failure up to the cap
+REPROBE_BASE_SECONDS = float(os.getenv('BOARD_REPROBE_BASE_HOURS', '24')) * 3600
+REPROBE_MAX_SECONDS = float(os.getenv('BOARD_REPROBE_MAX_HOURS', str(24 * 16))) * 3600
+
+class BoardQuarantined(requests.exceptions.RequestException):
+    """Raised instead of fetching a board that is quarantined and not yet due for a re-probe"""
+
+def reprobe_interval(failures: int) -> float:
+    """Seconds to wait before re-probing a board with this many consecutive failures"""
+    exponent = max(0, failures - QUARANTINE_AFTER)
+    return min(REPROBE_MAX_SECONDS, REPROBE_BASE_SECONDS * (2 ** exponent))
+
+class BoardHealth:
+    """Per-board failure record, persisted between runs
+
+    A board that fails QUARANTINE_AFTER runs in a row is quarantined: it is
+    skipped until its next_probe time, and each failed re-probe doubles the
+    wait. One successful fetch clears the record.
+    """
+
+    def __init__(self, records: Optional[Dict[str, Dict]] = None):
+        self.records = records or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> 'BoardHealth':
+        return cls(load_json(HEALTH_FILE, HEALTH_VERSION))
+
+    def save(self) -> None:
+        with self._lock:
+            save_json(HEALTH_FILE, self.records, HEALTH_VERSION)
+
+    def check(self, url: str) -> None:
+        """Raise BoardQuarantined if the board should not be fetched this run"""
+        with self._lock:
+            record = self.records.get(url)
+        if record and record.get('next_probe') and time.time() < record['next_probe']:
+            probe_at = datetime.fromtimestamp(record['next_probe'], tz=timezone.utc)
+            raise BoardQuarantined(
+                f"board quarantined after {record['failures']} failed runs "
+                f"(last error: {record.get('last_error')}), next probe {probe_at:%Y-%m-%d %H:%M} UTC"
+            )
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            self.records.pop(url, None)
+
+    def record_failure(self, url: str, error: Exception) -> None:
+        with self._lock:
+            record = self.records.setdefault(url, {'failures': 0})
+            record['failures'] += 1
+            record['last_error'] = str(error)[:200]
+            record['last_failure'] = time.time()
+            if record['failures'] >= QUARANTINE_AFTER:
+                record['next_probe'] = time.time() + reprobe_interval(record['failures'])
+
+    def quarantined(self) -> List[Tuple[str, Dict]]:
+        """(url, record) for every currently quarantined board"""
+        with self._lock:
+            return sorted(
+                (url, dict(record)) for url, record in self.records.items()
+                if record.get('next_probe')
+            )
+
+def print_quarantine_report(health: BoardHealth) -> None:
+    """Print the boards that are currently quarantined"""
+    quarantined = health.quarantined()
+    if not quarantined:
+        return
+    print(f"\n{len(quarantined)} boards are quarantined:")
+    for url, record in quarantined:
+        probe_at = datetime.fromtimestamp(record['next_probe'], tz=timezone.utc)
+        print(f"  {url} - {record['failures']} failed runs, next probe {probe_at:%Y-%m-%d %H:%M} UTC, last error: {record.get('last_error')}")
@@ -0,0 +1,171 @@
+"""Generate docs/gazetteer.json, the offline place-name table used by analyze_locations.
+
+Run `python build_gazetteer.py` after editing the tables below or upgrading
+pycountry. pycountry is only needed here; the scraper just reads the JSON.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+import pycountry
+
+from gazetteer import GAZETTEER_PATH, phrase_key
+
+# Country names job boards use that pycountry doesn't list, by ISO alpha-2 code
+COUNTRY_ALIASES = {
+    'US': 'US', 'USA': 'US', 'United States of America': 'US',
+    'UK': 'GB', 'Great Britain': 'GB', 'Britain': 'GB', 'England': 'GB',
+    'Scotland': 'GB', 'Wales': 'GB', 'Northern Ireland': 'GB',
+    'Russia': 'RU', 'South Korea': 'KR', 'Korea': 'KR', 'Vietnam': 'VN',
+    'Czech Republic': 'CZ', 'Turkey': 'TR', 'Türkiye': 'TR', 'Taiwan': 'TW',
+    'Iran': 'IR', 'Syria': 'SY', 'Laos': 'LA', 'Moldova': 'MD', 'Bolivia': 'BO',
+    'Venezuela': 'VE', 'Tanzania': 'TZ', 'Holland': 'NL', 'The Netherlands': 'NL',
+    'UAE': 'AE', 'Emirates': 'AE', 'KSA': 'SA', 'Ivory Coast': 'CI',
+    'Macedonia': 'MK', 'Palestine': 'PS', 'Brasil': 'BR', 'México': 'MX',
+    'Deutschland': 'DE', 'España': 'ES', 'Italia': 'IT', 'Polska': 'PL',
+}
+
+# Regions whose local names differ from what job boards write, by ISO alpha-2 code
+SUBDIVISION_ALIASES = {
+    'Bavaria': 'DE', 'North Rhine-Westphalia': 'DE', 'Lower Saxony': 'DE',
+    'Catalonia': 'ES', 'Andalusia': 'ES', 'Basque Country': 'ES',
+    'Lombardy': 'IT', 'Tuscany': 'IT', 'Flanders': 'BE', 'Wallonia': 'BE',
+    'Greater London': 'GB', 'Greater Manchester': 'GB', 'Mexico State': 'MX',
+    'Quebec': 'CA', 'NCR': 'IN', 'Delhi NCR': 'IN',
+}
+
+# Subdivision names that job boards use as region or direction words
+# ("APAC", "East Coast"), not as places
+SUBDIVISION_STOPWORDS = {'apac', 'north', 'south', 'east', 'west', 'coast', 'lakes'}
+
+# Major cities that show up in job board locations, by ISO alpha-2 code. Names
+# that are also common English words (Nice, Reading, Mobile) are left out.
+MAJOR_CITIES = {
+    'US': [
+        'New York City', 'Brooklyn', 'Manhattan', 'Los Angeles', 'San Diego', 'San Mateo',
+        'Redwood City', 'Menlo Park', 'Santa Clara', 'Cupertino', 'Oakland', 'Berkeley',
+        'Irvine', 'Santa Monica', 'Sacramento', 'Houston', 'Dallas', 'San Antonio',
+        'Fort Worth', 'Plano', 'Phoenix', 'Scottsdale', 'Tempe', 'Las Vegas', 'Salt Lake City',
+        'Lehi', 'Boulder', 'Minneapolis', 'Detroit', 'Ann Arbor', 'Columbus', 'Cleveland',
+        'Cincinnati', 'Indianapolis', 'Pittsburgh', 'Baltimore', 'Nashville', 'Charlotte',
+        'Durham', 'Tampa', 'Orlando', 'Jacksonville', 'St Louis', 'Kansas City', 'Milwaukee',
+        'Madison', 'Omaha', 'Bellevue', 'Redmond', 'Kirkland', 'Somerville', 'Honolulu',
+        'Anchorage', 'New Orleans', 'Richmond', 'Arlington', 'Reston', 'Herndon', 'McLean',
+    ],
+    'CA': ['Ottawa', 'Calgary', 'Edmonton', 'Waterloo', 'Kitchener', 'Winnipeg', 'Halifax', 'Mississauga'],
+    'GB': ['Birmingham', 'Bristol', 'Leeds', 'Glasgow', 'Liverpool', 'Cambridge', 'Oxford', 'Belfast', 'Cardiff', 'Newcastle'],
+    'IE': ['Cork', 'Galway', 'Limerick'],
+    'DE': ['Hamburg', 'Frankfurt', 'Frankfurt am Main', 'Cologne', 'Köln', 'Stuttgart', 'Düsseldorf', 'Dusseldorf', 'Leipzig', 'Dresden', 'München'],
+    'FR': ['Lyon', 'Marseille', 'Toulouse', 'Bordeaux', 'Lille', 'Nantes', 'Grenoble', 'Sophia Antipolis'],
+    'ES': ['Valencia', 'Seville', 'Sevilla', 'Malaga', 'Málaga', 'Bilbao'],
+    'PT': ['Lisbon', 'Lisboa', 'Porto'],
+    'IT': ['Milan', 'Milano', 'Rome', 'Roma', 'Turin', 'Torino', 'Bologna', 'Florence'],
+    'NL': ['Rotterdam', 'The Hague', 'Utrecht', 'Eindhoven'],
+    'BE': ['Brussels', 'Antwerp', 'Ghent'],
+    'CH': ['Zurich', 'Zürich', 'Geneva', 'Lausanne', 'Basel', 'Bern'],
+    'AT': ['Vienna', 'Wien', 'Graz'],
+    'SE': ['Stockholm', 'Gothenburg', 'Malmö', 'Malmo'],
+    'NO': ['Oslo', 'Bergen', 'Trondheim'],
+    'DK': ['Aarhus'],
+    'FI': ['Helsinki', 'Espoo', 'Tampere'],
+    'IS': ['Reykjavik'],
+    'PL': ['Krakow', 'Kraków', 'Wroclaw', 'Wrocław', 'Gdansk', 'Gdańsk', 'Poznan', 'Poznań', 'Lodz', 'Łódź'],
+    'CZ': ['Prague', 'Praha', 'Brno'],
+    'HU': ['Budapest'],
+    'RO': ['Bucharest', 'Cluj-Napoca', 'Cluj', 'Iasi'],
+    'BG': ['Sofia'],
+    'RS': ['Belgrade', 'Novi Sad'],
+    'HR': ['Zagreb'],
+    'GR': ['Athens', 'Thessaloniki'],
+    'UA': ['Kyiv', 'Kiev', 'Lviv', 'Kharkiv', 'Odesa'],
+    'EE': ['Tallinn', 'Tartu'],
+    'LV': ['Riga'],
+    'LT': ['Vilnius', 'Kaunas'],
+    'TR': ['Istanbul', 'Ankara', 'Izmir'],
+    'IL': ['Tel Aviv', 'Tel Aviv-Yafo', 'Jerusalem', 'Haifa', 'Herzliya', 'Ra\'anana'],
+    'AE': ['Dubai', 'Abu Dhabi'],
+    'SA': ['Riyadh', 'Jeddah'],
+    'QA': ['Doha'],
+    'EG': ['Cairo'],
+    'NG': ['Lagos', 'Abuja'],
+    'KE': ['Nairobi'],
+    'ZA': ['Cape Town', 'Johannesburg', 'Pretoria', 'Durban'],
+    'MA': ['Casablanca'],
+    'IN': ['Pune', 'Noida', 'Gurgaon', 'New Delhi', 'Kolkata', 'Ahmedabad', 'Jaipur', 'Kochi', 'Coimbatore', 'Trivandrum', 'Thiruvananthapuram'],
+    'PK': ['Karachi', 'Lahore', 'Islamabad'],
+    'BD': ['Dhaka'],
+    'LK': ['Colombo'],
+    'SG': ['Singapore'],
+    'MY': ['Kuala Lumpur', 'Penang'],
+    'ID': ['Jakarta', 'Bandung'],
+    'PH': ['Manila', 'Makati', 'Taguig', 'Cebu'],
+    'TH': ['Bangkok'],
+    'VN': ['Ho Chi Minh City', 'Hanoi', 'Da Nang'],
+    'CN': ['Beijing', 'Shanghai', 'Shenzhen', 'Guangzhou', 'Hangzhou', 'Chengdu'],
+    'HK': ['Hong Kong'],
+    'TW': ['Hsinchu', 'Taichung', 'Kaohsiung'],
+    'JP': ['Tokyo', 'Osaka', 'Kyoto', 'Fukuoka', 'Yokohama'],
+    'KR': ['Seoul', 'Busan', 'Pangyo'],
+    'AU': ['Perth', 'Adelaide', 'Canberra'],
+    'NZ': ['Auckland', 'Wellington', 'Christchurch'],
+    'BR': ['São Paulo', 'Sao Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Florianópolis', 'Florianopolis', 'Curitiba', 'Porto Alegre', 'Recife'],
+    'AR': ['Buenos Aires', 'Córdoba'],
+    'CL': ['Santiago'],
+    'CO': ['Bogotá', 'Bogota', 'Medellín', 'Medellin', 'Cali'],
+    'PE': ['Lima'],
+    'UY': ['Montevideo'],
+    'CR': ['San José', 'San Jose, Costa Rica'],
+    'MX': ['Tijuana', 'Querétaro', 'Queretaro', 'Puebla', 'Mérida'],
+}
+
+def country_name(alpha_2: str) -> str:
+    return pycountry.countries.get(alpha_2=alpha_2).name
+
+def build_gazetteer() -> dict:
+    countries = {}
+    codes = {}
+    for country in pycountry.countries:
+        for attribute in ('name', 'official_name', 'common_name'):
+            name = getattr(country, attribute, None)
+            if name:
+                countries.setdefault(phrase_key(name), country.name)
+        codes[country.alpha_2] = country.name
+        codes[country.alpha_3] = country.name
+    for alias, alpha_2 in COUNTRY_ALIASES.items():
+        countries[phrase_key(alias)] = country_name(alpha_2)
+
+    # Subdivision names shared by regions of different countries are ambiguous, so drop them
+    subdivision_countries = defaultdict(set)
+    for subdivision in pycountry.subdivisions:
+        key = phrase_key(subdivision.name)
+        if len(key) >= 4 and key not in SUBDIVISION_STOPWORDS:
+            subdivision_countries[key].add(country_name(subdivision.country_code))
+    subdivisions = {
+        key: names.pop() for key, names in subdivision_countries.items()
+        if len(names) == 1 and key not in countries
+    }
+    for alias, alpha_2 in SUBDIVISION_ALIASES.items():
+        subdivisions[phrase_key(alias)] = country_name(alpha_2)
+
+    cities = {}
+    for alpha_2, names in MAJOR_CITIES.items():
+        for name in names:
+            cities[phrase_key(name)] = country_name(alpha_2)
+
+    tables = {
+        'countries': dict(sorted(countries.items())),
+        'codes': dict(sorted(codes.items())),
+        'subdivisions': dict(sorted(subdivisions.items())),
+        'cities': dict(sorted(cities.items())),
+    }
+    version = hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return {'version': version, **tables}
+
+if __name__ == "__main__":
+    gazetteer = build_gazetteer()
+    with open(GAZETTEER_PATH, 'w', encoding='utf-8') as f:
+        json.dump(gazetteer, f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+    print(f"Wrote {GAZETTEER_PATH} (version {gazetteer['version']}): "
+          f"{len(gazetteer['countries'])} country names, {len(gazetteer['codes'])} codes, "
+          f"{len(gazetteer['subdivisions'])} subdivisions, {len(gazetteer['cities'])} cities")
@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+# Directory for state that persists between runs (restored by the workflow cache)
+CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', '.cache')
+
+def cache_path(name: str) -> str:
+    """Path of a file inside the cache directory"""
+    return os.path.join(CACHE_DIR, name)
+
+def load_json(name: str, version: Optional[str] = None) -> Dict[str, Any]:
+    """Load a JSON cache file, returning {} if it is missing, corrupt or from another version"""
+    try:
+        with open(cache_path(name), 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get('version') != version:
+        return {}
+    return payload.get('data') or {}
+
+def save_json(name: str, data: Dict[str, Any], version: Optional[str] = None) -> None:
+    """Atomically write a JSON cache file"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'data': data}, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path(name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional, Tuple
+
+# Everything before the greeting; the same for every email
+HTML_HEAD = """
+    <html>
+    <head>
+    <style>
+        table {
+            border-collapse: collapse;
+            width: 100%;
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+        }
+        th {
+            background-color: #2E7D32;
+            color: white;
+            text-align: left;
+            padding: 16px;
+            font-size: 14px;
+            font-weight: 600;
+        }
+        td {
+            padding: 16px;
+            border-bottom: 1px solid #E0E0E0;
+            font-size: 14px;
+            line-height: 1.4;
+        }
+        .company-header {
+            background-color: #F5F5F5;
+            font-weight: 600;
+            padding: 16px;
+            font-size: 16px;
+            color: #1A1A1A;
+        }
+        .apply-button {
+            background-color: #43b548;
+            color: white !important;
+            padding: 10px 20px;
+            text-decoration: none;
+            border-radius: 6px;
+            display: inline-block;
+            font-size: 14px;
+            font-weight: 500;
+            transition: all 0.2s ease;
+            border: none;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            text-align: center;
+            min-width: 100px;
+        }
+        .apply-button:visited {
+            color: white !important;
+        }
+        .apply-button:hover {
+            background-color: #1B5E20;
+            box-shadow: 0 4px 8px rgba(0,0,0,0.15);
+            transform: translateY(-1px);
+        }
+        tr:hover {
+            background-color: #F9F9F9;
+        }
+    </style>
+    </head>
+    <body>
+    """
+
+TABLE_START = """
+    <table>
+        <tr>
+            <th>Title</th>
+            <th>Location</th>
+            <th>Job Link</th>
+        </tr>
+    """
+
+HTML_END = """
+    </table>
+    </body>
+    </html>
+    """
+
+TEXT_RULE = "-" * 50
+
+def html_intro(user_name: Optional[str]) -> str:
+    """The personalized greeting above the job table"""
+    return f"""
+    <div style='margin-bottom:1.5rem;'>
+        <p style='font-size:1.1rem; color:#222;'>
+            Hello {user_name or 'there'},<br><br>
+            PingMeJobs is always on the lookout for the freshest roles, so you don't have to be.<br><br>
+            Here are roles that PingMeJobs found in the last 6 hours that match your preferences.<br><br>
+            <b>Check them out and apply early to get ahead of the crowd!</b>
+        </p>
+    </div>
+    """
+
+def text_intro(user_name: Optional[str]) -> str:
+    """The personalized greeting of the plain text email"""
+    return (
+        f"Hi {user_name},\n\n"
+        f"We're always on the lookout for the freshest roles, so you don't have to be.\n"
+        f"Here are roles that PingMeJobs found in the last 6 hours that match your preferences.\n"
+        f"Check them out and apply early to get ahead of the crowd!\n\n"
+    )
+
+class EmailRenderer:
+    """Renders notification bodies from fragments cached for the whole run
+
+    Each job's table row and text entry is rendered once, and each company
+    block (its header plus the rows of a given list of jobs) is joined once,
+    so users who share companies share the work. Whole job listings are
+    cached too, so users with the same matches differ only in the greeting.
+    Use one renderer per run; jobs are cached by job_id.
+    """
+
+    def __init__(self):
+        self._html_rows: Dict[str, str] = {}
+        self._text_entries: Dict[str, str] = {}
+        self._company_blocks: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._html_tables: Dict[Tuple[str, ...], str] = {}
+        self._text_listings: Dict[Tuple[str, ...], str] = {}
+
+    def html_row(self, job: Dict) -> str:
+        row = self._html_rows.get(job['job_id'])
+        if row is None:
+            row = f"""
+            <tr>
+                <td>{job['title']}</td>
+                <td>{job['location']}</td>
+                <td><a href="{job['url']}" class="apply-button">Apply Now</a></td>
+            </tr>
+            """
+            self._html_rows[job['job_id']] = row
+        return row
+
+    def company_block(self, company: str, jobs: List[Dict]) -> str:
+        key = (company, tuple(job['job_id'] for job in jobs))
+        block = self._company_blocks.get(key)
+        if block is None:
+            header = f"""
+        <tr>
+            <td colspan="3" class="company-header">{company}</td>
+        </tr>
+        """
+            block = header + ''.join(self.html_row(job) for job in jobs)
+            self._company_blocks[key] = block
+        return block
+
+    def html_table(self, jobs: List[Dict]) -> str:
+        """Table rows of the jobs grouped by company, in company order"""
+        key = tuple(job['job_id'] for job in jobs)
+        table = self._html_tables.get(key)
+        if table is None:
+            # Group jobs by company, keeping their order within each company
+            companies: Dict[str, List[Dict]] = {}
+            for job in jobs:
+                companies.setdefault(job['company'], []).append(job)
+            table = ''.join(self.company_block(company, companies[company]) for company in sorted(companies))
+            self._html_tables[key] = table
+        return table
+
+    def html(self, jobs: List[Dict], user_name: Optional[str] = None) -> str:
+        """HTML table of the jobs grouped by company, with a friendly intro message"""
+        return ''.join([HTML_HEAD, html_intro(user_name), TABLE_START, self.html_table(jobs), HTML_END])
+
+    def text_entry(self, job: Dict) -> str:
+        entry = self._text_entries.get(job['job_id'])
+        if entry is None:
+            entry = (
+                f"Company: {job['company']}\n"
+                f"Position: {job['title']}\n"
+                f"Location: {job['location']}\n"
+                f"Apply: {job['url']}\n"
+                f"{TEXT_RULE}\n\n"
+            )
+            self._text_entries[job['job_id']] = entry
+        return entry
+
+    def text_listing(self, jobs: List[Dict]) -> str:
+        key = tuple(job['job_id'] for job in jobs)
+        listing = self._text_listings.get(key)
+        if listing is None:
+            listing = ''.join(self.text_entry(job) for job in jobs)
+            self._text_listings[key] = listing
+        return listing
+
+    def text(self, jobs: List[Dict], user_name: Optional[str] = None) -> str:
+        """Plain text listing of the jobs in the user's order"""
+        return text_intro(user_name) + self.text_listing(jobs)
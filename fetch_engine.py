@@ -0,0 +1,78 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# API hosts for each supported ATS provider
+GREENHOUSE_HOST = 'boards-api.greenhouse.io'
+ASHBY_HOST = 'api.ashbyhq.com'
+LEVER_HOST = 'api.lever.co'
+
+# Total number of boards fetched at once across all providers
+MAX_WORKERS = int(os.getenv('SCRAPER_MAX_WORKERS', '32'))
+
+# Number of boards fetched at once from a single provider host
+PER_HOST_LIMIT = int(os.getenv('SCRAPER_PER_HOST_LIMIT', '8'))
+PER_HOST_LIMITS = {
+    ASHBY_HOST: int(os.getenv('SCRAPER_ASHBY_HOST_LIMIT', '4')),
+}
+
+# A task is (host, function, args)
+Task = Tuple[str, Callable[..., Any], tuple]
+
+def interleave_by_host(indexed_tasks: List[Tuple[int, Task]]) -> List[Tuple[int, Task]]:
+    """Round-robin tasks across hosts so one large provider can't occupy every worker"""
+    by_host: Dict[str, List[Tuple[int, Task]]] = {}
+    for item in indexed_tasks:
+        by_host.setdefault(item[1][0], []).append(item)
+
+    queues = list(by_host.values())
+    interleaved = []
+    position = 0
+    while len(interleaved) < len(indexed_tasks):
+        for queue in queues:
+            if position < len(queue):
+                interleaved.append(queue[position])
+        position += 1
+    return interleaved
+
+def run_tasks(tasks: List[Task], max_workers: int = MAX_WORKERS,
+              per_host_limit: Optional[int] = None) -> List[Any]:
+    """Run board fetch tasks concurrently with a per-host concurrency cap
+
+    Args:
+        tasks: List of (host, function, args) tuples
+        max_workers: Maximum number of tasks running at once
+        per_host_limit: Maximum number of tasks running at once against the same host.
+            Defaults to PER_HOST_LIMITS for known hosts and PER_HOST_LIMIT otherwise.
+
+    Returns:
+        The task results in the same order as tasks. A task that raises yields None.
+    """
+    if not tasks:
+        return []
+
+    semaphores = {}
+    for host, _, _ in tasks:
+        if host not in semaphores:
+            limit = per_host_limit or PER_HOST_LIMITS.get(host, PER_HOST_LIMIT)
+            semaphores[host] = threading.BoundedSemaphore(max(1, limit))
+
+    def run_one(task: Task) -> Any:
+        host, func, args = task
+        with semaphores[host]:
+            return func(*args)
+
+    results: List[Any] = [None] * len(tasks)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        futures = {
+            index: executor.submit(run_one, task)
+            for index, task in interleave_by_host(list(enumerate(tasks)))
+        }
+        for index, future in futures.items():
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                host, func, args = tasks[index]
+                print(f"Error running {func.__name__}{args} against {host}: {e}")
+    return results
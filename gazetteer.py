@@ -0,0 +1,32 @@
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List
+
+# Generated by build_gazetteer.py; regenerate after editing its tables or upgrading pycountry
+GAZETTEER_PATH = os.path.join('docs', 'gazetteer.json')
+
+_LOCATION_WORD_RE = re.compile(r"[^\W_]+(?:\.[^\W_]+)*")
+
+def fold_accents(text: str) -> str:
+    """text with its accents stripped, so that Québec reads as Quebec"""
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+def tokenize_location(location: str) -> List[str]:
+    """Accent-folded words of a location in their original case, with dots dropped so "U.S." and "US" match"""
+    return [word.replace('.', '') for word in _LOCATION_WORD_RE.findall(fold_accents(location))]
+
+def phrase_key(phrase: str) -> str:
+    """Gazetteer key for a place name: its lowercased words joined by single spaces"""
+    return ' '.join(word.lower() for word in tokenize_location(phrase))
+
+def load_gazetteer(path: str = GAZETTEER_PATH) -> Dict:
+    """Load the gazetteer in a single read
+
+    Keys of 'countries', 'subdivisions' and 'cities' are phrase_key()s,
+    'codes' holds upper-case ISO alpha-2/alpha-3 codes, and every value is a
+    country name.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from disk_cache import load_json, save_json
+
+CACHE_FILE = 'http_cache.json'
+CACHE_VERSION = '1'
+
+# Most board URLs remembered; the least recently used entries are dropped first
+MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '2000'))
+
+def body_hash(content: bytes) -> str:
+    """Stable hash of a response body"""
+    return hashlib.sha256(content).hexdigest()
+
+class ResponseCache:
+    """Validators (ETag, Last-Modified, body hash) for board URLs, persisted between runs
+
+    Only validators are stored, not bodies: a board that is unchanged since
+    the last run has no new jobs, so its payload never needs to be replayed.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None):
+        self.entries = entries or {}
+        # URLs whose validators were confirmed or replaced by this process
+        self.fetched: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> 'ResponseCache':
+        return cls(load_json(CACHE_FILE, CACHE_VERSION))
+
+    def save(self) -> None:
+        with self._lock:
+            entries = sorted(self.entries.items(), key=lambda item: item[1].get('last_used', 0))
+            self.entries = dict(entries[-MAX_ENTRIES:])
+            save_json(CACHE_FILE, self.entries, CACHE_VERSION)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached URL"""
+        with self._lock:
+            entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        with self._lock:
+            entry = self.entries.get(url)
+        return bool(entry) and entry.get('body_hash') == digest
+
+    def touch(self, url: str) -> None:
+        with self._lock:
+            if url in self.entries:
+                self.entries[url]['last_used'] = time.time()
+                self.fetched.add(url)
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], digest: str) -> None:
+        with self._lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'body_hash': digest,
+                'last_used': time.time(),
+            }
+            self.fetched.add(url)
+
+    def fetched_entries(self) -> Dict[str, Dict]:
+        """Entries of the URLs fetched by this process, to hand to the process that saves the cache"""
+        with self._lock:
+            return {url: dict(self.entries[url]) for url in self.fetched if url in self.entries}
+
+    def update(self, entries: Dict[str, Dict]) -> None:
+        """Take over entries fetched by another process"""
+        with self._lock:
+            self.entries.update(entries)
@@ -0,0 +1,175 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_engine import PER_HOST_LIMIT, PER_HOST_LIMITS
+from rate_limiter import get_limiter, parse_retry_after
+from http_cache import ResponseCache, body_hash
+from board_health import BoardHealth, print_quarantine_report
+
+# (connect, read) timeout in seconds applied to every board request
+DEFAULT_TIMEOUT = (
+    float(os.getenv('SCRAPER_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('SCRAPER_READ_TIMEOUT', '20')),
+)
+
+USER_AGENT = 'PingMeJobs job scraper'
+
+# Extra attempts for transient failures (connection errors, timeouts, 429 and 5xx)
+MAX_RETRIES = int(os.getenv('SCRAPER_MAX_RETRIES', '2'))
+RETRY_BACKOFF = 0.5
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# Conditional-GET validators, only used once enable_response_cache() is called
+_response_cache: Optional[ResponseCache] = None
+
+# Per-board failure record, only used once enable_board_health() is called
+_board_health: Optional[BoardHealth] = None
+
+def get_session(host: str) -> requests.Session:
+    """Shared keep-alive session for a provider host, created on first use
+
+    The connection pool is sized to the host's concurrency cap in the fetch
+    engine so every worker can reuse an open connection.
+    """
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            pool_size = PER_HOST_LIMITS.get(host, PER_HOST_LIMIT)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET a URL over its host's pooled session, paced by the host's rate limiter"""
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlparse(url).netloc
+    limiter = get_limiter(host)
+    limiter.acquire()
+    response = get_session(host).get(url, **kwargs)
+    limiter.record_response(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+    return response
+
+def get_with_retries(url: str, **kwargs) -> requests.Response:
+    """GET with bounded, jittered exponential backoff on transient failures
+
+    The final attempt's response is returned (or its exception raised) as is.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        final_attempt = attempt == MAX_RETRIES
+        try:
+            response = get(url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if final_attempt:
+                raise
+        else:
+            if final_attempt or response.status_code not in TRANSIENT_STATUS_CODES:
+                return response
+            # Retry-After is enforced by the host's rate limiter on the next attempt
+            response.close()
+        time.sleep(random.uniform(0, RETRY_BACKOFF * (2 ** attempt)))
+
+def enable_response_cache() -> None:
+    """Load the on-disk response cache and send conditional requests from now on"""
+    global _response_cache
+    _response_cache = ResponseCache.load()
+
+def save_response_cache() -> None:
+    """Persist the response cache, if enabled
+
+    Call this only once the fetched jobs have been stored, so a crashed run
+    doesn't mark boards as seen.
+    """
+    if _response_cache is not None:
+        _response_cache.save()
+
+def fetched_validators() -> Dict[str, Dict]:
+    """Validators of the boards this process fetched, if the response cache is enabled
+
+    A shard writes these into its results instead of saving them, because
+    only the merge step knows when the shard's jobs are stored.
+    """
+    return _response_cache.fetched_entries() if _response_cache is not None else {}
+
+def add_validators(entries: Dict[str, Dict]) -> None:
+    """Add validators fetched by shards to the response cache; save_response_cache() persists them"""
+    if _response_cache is not None:
+        _response_cache.update(entries)
+
+def enable_board_health() -> None:
+    """Load the on-disk board health record and quarantine repeatedly failing boards"""
+    global _board_health
+    _board_health = BoardHealth.load()
+
+def save_board_health() -> None:
+    """Persist the board health record, if enabled, and report quarantined boards"""
+    if _board_health is not None:
+        _board_health.save()
+        print_quarantine_report(_board_health)
+
+def fetch_board_json(url: str) -> Optional[Any]:
+    """Fetch and parse a board's JSON payload
+
+    Returns None when the response cache is enabled and the board is
+    unchanged since it was last fetched (HTTP 304 or identical body), so
+    callers can skip parsing and classifying its jobs entirely.
+
+    Raises BoardQuarantined without fetching when board health is enabled
+    and the board is quarantined.
+    """
+    health = _board_health
+    if health is None:
+        return _fetch_board_json(url)
+
+    health.check(url)
+    try:
+        data = _fetch_board_json(url)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        health.record_failure(url, e)
+        raise
+    health.record_success(url)
+    return data
+
+def _fetch_board_json(url: str) -> Optional[Any]:
+    cache = _response_cache
+    if cache is None:
+        response = get_with_retries(url)
+        response.raise_for_status()
+        return response.json()
+
+    response = get_with_retries(url, headers=cache.conditional_headers(url))
+    if response.status_code == 304:
+        cache.touch(url)
+        return None
+    response.raise_for_status()
+
+    digest = body_hash(response.content)
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if cache.is_unchanged(url, digest):
+        cache.store(url, etag, last_modified, digest)
+        return None
+
+    data = response.json()
+    cache.store(url, etag, last_modified, digest)
+    return data
+
+def close_sessions() -> None:
+    """Close every pooled session"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,76 @@
+import hashlib
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+def preference_signature(user_preferences: Dict) -> str:
+    """Hash of the canonical form of a user's preferences
+
+    Users with the same signature match exactly the same jobs: order and
+    duplicates in the preference lists don't matter, an empty list is the
+    same as a missing one, and 'any' location stands for every location list
+    that contains it.
+    """
+    locations = user_preferences.get('locationPreferences') or []
+    canonical = {
+        'companies': sorted(set(user_preferences.get('companies') or [])),
+        'jobTypes': sorted(set(user_preferences.get('jobTypes') or [])),
+        'experienceLevels': sorted(set(user_preferences.get('experienceLevels') or [])),
+        'locationPreferences': ['any'] if 'any' in locations else sorted(set(locations)),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+class JobIndex:
+    """A run's new jobs indexed by company, role type, experience level and country
+
+    Built once per run, then match() answers each user's preferences with set
+    intersections instead of scanning every job. Matches are the jobs a
+    scan of every job would keep, in the same order.
+    """
+
+    def __init__(self, jobs: List[Dict]):
+        self.jobs = list(jobs)
+        self.by_company: Dict[str, Set[int]] = defaultdict(set)
+        self.by_role_type: Dict[str, Set[int]] = defaultdict(set)
+        self.by_experience_level: Dict[str, Set[int]] = defaultdict(set)
+        self.by_country: Dict[str, Set[int]] = defaultdict(set)
+        for position, job in enumerate(self.jobs):
+            self.by_company[job['company'].lower()].add(position)
+            self.by_role_type[job['role_type']].add(position)
+            self.by_experience_level[job['experience_level']].add(position)
+            for country in job.get('countries', {}).values():
+                self.by_country[country].add(position)
+
+    @staticmethod
+    def _union(index: Dict[str, Set[int]], values: Iterable[str]) -> Set[int]:
+        positions = set()
+        for value in set(values):
+            positions |= index.get(value, set())
+        return positions
+
+    def match(self, user_preferences: Dict) -> List[Dict]:
+        """Jobs matching a user's companies, jobTypes, experienceLevels and locationPreferences
+
+        An empty or missing preference doesn't filter, and 'any' among the
+        location preferences accepts every location.
+        """
+        filters = [
+            (self.by_company, user_preferences.get('companies')),
+            (self.by_role_type, user_preferences.get('jobTypes')),
+            (self.by_experience_level, user_preferences.get('experienceLevels')),
+        ]
+        locations = user_preferences.get('locationPreferences')
+        if locations and 'any' not in locations:
+            filters.append((self.by_country, locations))
+
+        matches: Optional[Set[int]] = None
+        for index, values in filters:
+            if not values:
+                continue
+            positions = self._union(index, values)
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return []
+        if matches is None:
+            return list(self.jobs)
+        return [self.jobs[position] for position in sorted(matches)]
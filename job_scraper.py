@@ -1,344 +1,409 @@
-import os
+import argparse
+import gzip
 import json
+import os
+from datetime import datetime, timedelta, timezone
 import requests
-import firebase_admin
-from firebase_admin import credentials, firestore
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 from greenhouse_scraper import scrape_greenhouse_jobs, load_companies as load_greenhouse_companies
-from ashby_scraper import scrape_all_ashby_jobs, load_ashby_companies
+from ashby_scraper import scrape_ashby_jobs, load_ashby_companies
 from lever_scraper import scrape_lever_jobs, load_lever_companies
+from job_matcher import JobIndex, preference_signature
+from email_renderer import EmailRenderer
+from mailer import SMTP_DRY_RUN, DryRunMailer, SMTPPool
+from outbox import Outbox
+from fetch_engine import GREENHOUSE_HOST, ASHBY_HOST, LEVER_HOST, run_tasks
+from http_client import (add_validators, close_sessions, enable_board_health, enable_response_cache,
+                         fetched_validators, save_board_health, save_response_cache)
+from title_classifier import save_title_cache
+from analyze_locations import save_location_cache
+from seen_jobs import SeenJobsIndex
+from storage import STORAGE_BACKEND, close_storage, get_storage, json_default
+from sharding import (SHARD_RESULTS_DIR, parse_shard_spec, read_shard_results,
+                      shard_boards, write_shard_results)
 from dateutil import parser
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Firebase with JSON directly
-cred_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
-if cred_json:
-    cred = credentials.Certificate(json.loads(cred_json))
-else:
-    FIREBASE_CREDS_PATH = 'config/firebase-adminsdk-fbsvc-9318d491d4.json' #ac74291157
-    cred = credentials.Certificate(FIREBASE_CREDS_PATH)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
-
 # Load companies from all configs
 GREENHOUSE_COMPANIES = load_greenhouse_companies()
 ASHBY_COMPANIES = load_ashby_companies()
 LEVER_COMPANIES = load_lever_companies()
 
-def scrape_jobs():
-    new_jobs = []
-    total_jobs_found = 0
-    
-    # Get all users and their preferences
-    users = db.collection('users').get()
-    user_preferences = {}
-    for user in users:
-        user_data = user.to_dict()
-        # Only include verified users with non-empty preferences and email
-        preferences = user_data.get('preferences', [])
-        job_types = user_data.get('jobTypes', [])  # Default to empty array if not specified
-        if (user_data.get('emailVerified', False) and preferences and user_data.get('email')):
-            user_preferences[user_data['email']] = {
-                'companies': preferences,
-                'jobTypes': job_types,
-                'experienceLevels': user_data.get('experienceLevels', []),  # Get experience level preferences
-                'locationPreferences': user_data.get('locationPreferences', [])  # Get location preferences
-            }
-    
-    # Scrape Greenhouse jobs
-    print("\nScraping Greenhouse jobs...")
+# Fetch function and API host for each provider
+PROVIDER_SCRAPERS = {
+    'greenhouse': (GREENHOUSE_HOST, scrape_greenhouse_jobs),
+    'ashby': (ASHBY_HOST, scrape_ashby_jobs),
+    'lever': (LEVER_HOST, scrape_lever_jobs),
+}
+
+# Field holding each provider's posting time before it becomes last_updated
+PROVIDER_TIMESTAMP_FIELDS = {
+    'greenhouse': 'updated_at',
+    'ashby': 'published_at',
+    'lever': 'updated_at',
+}
+
+# Jobs last updated longer ago than this are archived and deleted by --compact
+JOB_TTL_DAYS = float(os.getenv('JOB_TTL_DAYS', '30'))
+
+# Where --compact writes its gzipped NDJSON archives
+JOB_ARCHIVE_DIR = os.getenv('JOB_ARCHIVE_DIR', 'archive')
+
+# How users without a deliveryPolicy of their own are notified:
+#   'always'    email every run, with a 'no new positions' email when nothing matched
+#   'immediate' email every run that has matches, and nothing otherwise
+#   'digest'    hold matches back and send them in one email every DIGEST_EVERY_RUNS runs
+DELIVERY_POLICIES = ('always', 'immediate', 'digest')
+DEFAULT_DELIVERY_POLICY = os.getenv('DEFAULT_DELIVERY_POLICY', 'immediate')
+if DEFAULT_DELIVERY_POLICY not in DELIVERY_POLICIES:
+    raise ValueError(f"Unknown DEFAULT_DELIVERY_POLICY '{DEFAULT_DELIVERY_POLICY}', "
+                     f"expected one of {', '.join(DELIVERY_POLICIES)}")
+
+# Runs a digest collects matches over, counted from its first match, unless a user sets digestEveryRuns
+DIGEST_EVERY_RUNS = int(os.getenv('DIGEST_EVERY_RUNS', '4'))
+
+# A digest holding this many jobs is sent early, keeping pending digests well under Firestore's document limit
+DIGEST_MAX_JOBS = 1000
+
+def get_boards():
+    """Combined (provider, company_name, board_token) list across all provider configs"""
+    boards = [('greenhouse', name, token) for name, token in GREENHOUSE_COMPANIES.items()]
+    boards += [('ashby', name, token) for name, token in ASHBY_COMPANIES.items()]
+    boards += [('lever', name, token) for name, token in LEVER_COMPANIES.items()]
+    return boards
+
+def scrape_boards(boards):
+    """Scrape boards on the fetch engine and return (provider, company_name, jobs) in board order"""
+    tasks = []
+    for provider, company_name, board_token in boards:
+        host, scrape = PROVIDER_SCRAPERS[provider]
+        tasks.append((host, scrape, (company_name, board_token)))
+    results = run_tasks(tasks)
+    return [
+        (provider, company_name, jobs or [])
+        for (provider, company_name, _), jobs in zip(boards, results)
+    ]
+
+def collect_jobs(boards):
+    """Scrape boards and return their (provider, job) pairs and the total number of jobs found"""
+    print(f"\nScraping {len(boards)} Greenhouse, Ashby and Lever boards...")
+    scraped = []
+    for provider, company_name, company_jobs in scrape_boards(boards):
+        scraped.extend((provider, job) for job in company_jobs)
+    return scraped, len(scraped)
+
+def find_new_jobs(scraped, seen_index):
+    """The jobs that aren't in the database yet, and the documents to store for them
+
+    IDs in the local seen-jobs index are skipped without a database lookup;
+    only the rest are checked against the database. Nothing is written.
+    """
+    job_ids = {job['job_id'] for _, job in scraped}
+    seen = seen_index.seen(job_ids)
+    candidates = job_ids - seen
+    stored = get_storage().known_job_ids(candidates)
+    seen_index.record_remote_check(len(candidates), len(stored))
+    seen_index.add(stored)
+    seen |= stored
+
     all_new_jobs = []
-    for company_name, board_token in GREENHOUSE_COMPANIES.items():
-        print(f"Scraping jobs from {company_name}...")
-        company_jobs = scrape_greenhouse_jobs(company_name, board_token)
-        total_jobs_found += len(company_jobs)
+    job_docs = []
+    for provider, job in scraped:
+        # Skip jobs already in the database or added earlier in this run
+        if job['job_id'] in seen:
+            continue
+        seen.add(job['job_id'])
+
+        timestamp_field = PROVIDER_TIMESTAMP_FIELDS[provider]
         
-        for job in company_jobs:
-            # Create the job document with timestamp
-            job_doc = {
-                **job,  # Include all existing job fields
-                'last_updated': job['updated_at'],  # Use the datetime object directly
-                'added_to_db': firestore.SERVER_TIMESTAMP  # When we added it to the database
-            }
-            
-            # Remove the temporary updated_at field since we now have last_updated
-            job_doc.pop('updated_at', None)
-            
-            # Check if job already exists in database using job_id
-            job_ref = db.collection('jobs').where('job_id', '==', job['job_id']).get()
-            
-            if not job_ref:
-                # Add to database
-                db.collection('jobs').add(job_doc)
-                all_new_jobs.append(job)
-                print(f"Added new job: {job['title']} at {job['company']} (ID: {job['job_id']}) {job['experience_level']}- Last Updated {job['hours_ago']} hours ago")
-    
-    # Scrape Ashby jobs
-    print("\nScraping Ashby jobs...")
-    ashby_jobs = scrape_all_ashby_jobs()
-    total_jobs_found += len(ashby_jobs)
-    
-    for job in ashby_jobs:
         # Create the job document with timestamp
         job_doc = {
             **job,  # Include all existing job fields
-            'last_updated': job['published_at'],  # Use the published_at datetime object
-            'added_to_db': firestore.SERVER_TIMESTAMP  # When we added it to the database
+            'last_updated': job[timestamp_field],  # Use the datetime object directly
         }
         
-        # Remove the temporary published_at field since we now have last_updated
-        job_doc.pop('published_at', None)
-        
-        # Check if job already exists in database using job_id
-        job_ref = db.collection('jobs').where('job_id', '==', job['job_id']).get()
-        
-        if not job_ref:
-            # Add to database
-            db.collection('jobs').add(job_doc)
-            all_new_jobs.append(job)
-            print(f"Added new job: {job['title']} at {job['company']} (ID: {job['job_id']}) {job['experience_level']}- Posted {job['hours_ago']} hours ago")
-    
-    # Scrape Lever jobs
-    print("\nScraping Lever jobs...")
-    for company_name, lever_subdomain in LEVER_COMPANIES.items():
-        print(f"Scraping jobs from {company_name}...")
-        lever_jobs = scrape_lever_jobs(company_name, lever_subdomain)
-        total_jobs_found += len(lever_jobs)
-        for job in lever_jobs:
-            job_doc = {
-                **job,
-                'last_updated': job['updated_at'],
-                'added_to_db': firestore.SERVER_TIMESTAMP
-            }
-            job_doc.pop('updated_at', None)
-            job_ref = db.collection('jobs').where('job_id', '==', job['job_id']).get()
-            if not job_ref:
-                db.collection('jobs').add(job_doc)
-                all_new_jobs.append(job)
-                print(f"Added new job: {job['title']} at {job['company']} (ID: {job['job_id']}) {job['experience_level']}- Last Updated {job['hours_ago']} hours ago")
-    
-    # Send personalized emails to each verified user based on their preferences
-    verified_users = len(user_preferences)
-    print(f"\nFound {verified_users} verified users with preferences")
-    
-    for email, prefs in user_preferences.items():
-        # Get the user's name (first word only)
-        user_name = None
-        user_doc = db.collection('users').where('email', '==', email).get()
-        if user_doc:
-            user_data = user_doc[0].to_dict()
-            name = user_data.get('name', '').strip()
-            if name:
-                user_name = name.split()[0]
-        if not user_name:
-            user_name = 'there'
-        # Filter jobs based on user preferences (company, job type, and experience level)
-        user_jobs = filter_jobs_for_user(all_new_jobs, prefs)
-        # Always send email notification, even if no new jobs
-        send_email_notification(user_jobs, email, user_name)
+        # Remove the temporary timestamp field since we now have last_updated
+        job_doc.pop(timestamp_field, None)
+        job_docs.append(job_doc)
+        all_new_jobs.append(job)
+    return all_new_jobs, job_docs
+
+def store_jobs(job_docs, seen_index):
+    """Write new job documents and record them in the seen-jobs index"""
+    # The storage backend stamps added_to_db when it writes
+    get_storage().upsert_jobs(job_docs)
+    seen_index.add(job['job_id'] for job in job_docs)
+    for job in job_docs:
+        print(f"Added new job: {job['title']} at {job['company']} (ID: {job['job_id']}) {job['experience_level']}- Last Updated {job['hours_ago']} hours ago")
+    print(seen_index.stats())
+
+def rebuild_seen_index():
+    """Rebuild the local seen-jobs index from every job_id in the jobs collection"""
+    seen_index = SeenJobsIndex()
+    try:
+        count = seen_index.rebuild(get_storage().iter_job_ids())
+    finally:
+        seen_index.close()
+    print(f"Rebuilt seen-jobs index with {count} job IDs")
+
+def queue_notifications(outbox, all_new_jobs):
+    """Queue a personalized email for each verified user based on their preferences
+
+    Every message is in the durable outbox before the run's jobs are stored,
+    and digests are saved once their emails are safely in the outbox.
+    """
+    leftover = outbox.pending_count()
+    if leftover:
+        print(f"\n{leftover} emails left in the outbox by a previous run will be delivered first")
+
+    pending_digests = dict(get_storage().iter_pending_digests())
+    digest_updates = {}
+    queued = outbox.enqueue(render_notifications(JobIndex(all_new_jobs), EmailRenderer(), pending_digests,
+                                                 digest_updates))
+    get_storage().save_pending_digests(digest_updates)
+    print(f"\nQueued emails for {queued} verified users with preferences")
+
+def send_notifications(outbox):
+    """Deliver everything in the outbox, oldest first, so a previous run's leftovers go out before this run's"""
+    # One set of logged-in SMTP connections serves every user
+    with open_mailer() as mailer:
+        sent, failed = outbox.drain(mailer)
+        print(f"Sent {sent} emails over {mailer.connections_opened} SMTP connections, {failed} failed")
+
+def delivery_policy(user):
+    """(policy, every_runs) for a user, falling back to DEFAULT_DELIVERY_POLICY and DIGEST_EVERY_RUNS"""
+    delivery = user.get('delivery') or {}
+    policy = delivery.get('policy')
+    if policy not in DELIVERY_POLICIES:
+        policy = DEFAULT_DELIVERY_POLICY
+    try:
+        every_runs = max(1, int(delivery.get('every_runs') or DIGEST_EVERY_RUNS))
+    except (TypeError, ValueError):
+        every_runs = DIGEST_EVERY_RUNS
+    return policy, every_runs
+
+def merge_jobs(held_jobs, new_jobs):
+    """held_jobs followed by the new_jobs not already among them"""
+    held_ids = {job['job_id'] for job in held_jobs}
+    return list(held_jobs) + [job for job in new_jobs if job['job_id'] not in held_ids]
+
+def open_mailer():
+    """The run's SMTPPool, or a DryRunMailer under SMTP_DRY_RUN or on the SQLite store without SMTP_HOST
+
+    The SQLite store holds synthetic users, so it never mails through the
+    default Gmail host unless a server is named explicitly.
+    """
+    if SMTP_DRY_RUN or (STORAGE_BACKEND == 'sqlite' and not os.getenv('SMTP_HOST')):
+        print("Dry run: emails are queued and marked sent without connecting to an SMTP server")
+        return DryRunMailer()
+    return SMTPPool(os.getenv('EMAIL_USER'), os.getenv('EMAIL_PASSWORD'))
+
+def render_notifications(job_index, renderer, pending_digests, digest_updates):
+    """(recipient, MIME text) of every verified user's email, matched against the run's new jobs
+
+    Users are grouped by preference signature: each group's jobs are matched
+    and its body rendered once, and only the greeting differs per user.
+
+    Each user's delivery policy decides whether they get an email this run.
+    pending_digests maps emails to the matches held back by earlier runs;
+    the new state of every digest that changed is put in digest_updates,
+    with None for digests that were sent or are no longer needed.
+    """
+    group_matches = {}
+    users = skipped = deferred = digests = 0
+    for user in get_storage().iter_users():
+        users += 1
+        email = user['email']
+        # Filter jobs based on user preferences (company, job type, experience level and location)
+        signature = preference_signature(user['preferences'])
+        user_jobs = group_matches.get(signature)
+        if user_jobs is None:
+            user_jobs = group_matches[signature] = job_index.match(user['preferences'])
+
+        policy, every_runs = delivery_policy(user)
+        pending = pending_digests.pop(email, None)
+        if pending:
+            # Held matches go out with the next email, even if the user has left the digest policy since
+            user_jobs = merge_jobs(pending['jobs'], user_jobs)
+            digest_updates[email] = None
+        if policy == 'digest' and user_jobs:
+            runs = (pending['runs'] if pending else 0) + 1
+            if runs < every_runs and len(user_jobs) < DIGEST_MAX_JOBS:
+                digest_updates[email] = {'runs': runs, 'jobs': user_jobs}
+                deferred += 1
+                continue
+            digests += 1
+        if not user_jobs and policy != 'always':
+            skipped += 1
+            continue
+
+        yield email, build_email_message(user_jobs, email, user['name'], renderer).as_string()
         if user_jobs:
-            print(f"Sent notification to {email} with {len(user_jobs)} matching jobs")
+            print(f"Queued notification to {email} with {len(user_jobs)} matching jobs")
         else:
-            print(f"Sent 'no new jobs' notification to {email}")
+            print(f"Queued 'no new jobs' notification to {email}")
+
+    # Digests of users who are gone or no longer verified
+    for email in pending_digests:
+        digest_updates[email] = None
+    print(f"\nMatched {users} users in {len(group_matches)} distinct preference signatures")
+    print(f"Delivery: {digests} digests sent, {deferred} users' matches held for a digest, "
+          f"{skipped} users with nothing to send skipped")
+
+def process_jobs(scraped, total_jobs_found):
+    """Find the new jobs, queue their notifications, store the jobs, then send the emails
+
+    Notifications reach the durable outbox before the jobs are stored and
+    marked seen, so a crash in between announces those jobs again on the
+    next run instead of never. A crash while sending loses nothing either:
+    the next run delivers what is left in the outbox.
+    """
+    outbox = Outbox()
+    try:
+        seen_index = SeenJobsIndex()
+        try:
+            all_new_jobs, job_docs = find_new_jobs(scraped, seen_index)
+            queue_notifications(outbox, all_new_jobs)
+            store_jobs(job_docs, seen_index)
+        finally:
+            seen_index.close()
+        
+        # Every board's jobs are stored now, so unchanged boards can be skipped next run
+        save_response_cache()
+        save_board_health()
+        save_title_cache()
+        save_location_cache()
+        
+        send_notifications(outbox)
+    finally:
+        outbox.close()
     
+    print(f"\nScraped {total_jobs_found} matching jobs")
     if all_new_jobs:
         print(f"\nFound {len(all_new_jobs)} new jobs in total!")
     else:
         print("\nNo new jobs found.")
 
-def filter_jobs_for_user(jobs, user_preferences):
-    """Filter jobs based on user preferences."""
-    filtered_jobs = []
-    
-    for job in jobs:
-        # Check company preference
-        if user_preferences.get('companies') and job['company'].lower() not in user_preferences['companies']:
-            continue
-            
-        # Check job type preference
-        if user_preferences.get('jobTypes') and job['role_type'] not in user_preferences['jobTypes']:
-            continue
-            
-        # Check experience level preference
-        if user_preferences.get('experienceLevels') and job['experience_level'] not in user_preferences['experienceLevels']:
-            continue
-            
-        # Check location preference
-        if user_preferences.get('locationPreferences'):
-            # If "Any Location" is selected, skip location filtering
-            if 'any' in user_preferences['locationPreferences']:
-                filtered_jobs.append(job)
-                continue
-                
-            job_countries = job.get('countries', {})
-            user_locations = user_preferences['locationPreferences']
-            
-            # Convert job countries dictionary to list of values
-            job_countries_list = list(job_countries.values())
-            
-            # If job has no countries or none match user preferences, skip
-            if not job_countries_list or not any(country in user_locations for country in job_countries_list):
-                continue
-        
-        filtered_jobs.append(job)
-    
-    return filtered_jobs
-
-def create_html_table(jobs, user_name=None):
-    """Create an HTML table for the jobs with a friendly intro message"""
-    intro = f"""
-    <div style='margin-bottom:1.5rem;'>
-        <p style='font-size:1.1rem; color:#222;'>
-            Hello {user_name or 'there'},<br><br>
-            PingMeJobs is always on the lookout for the freshest roles, so you don't have to be.<br><br>
-            Here are roles that PingMeJobs found in the last 6 hours that match your preferences.<br><br>
-            <b>Check them out and apply early to get ahead of the crowd!</b>
-        </p>
-    </div>
-    """
-    html = f"""
-    <html>
-    <head>
-    <style>
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-        }}
-        th {{
-            background-color: #2E7D32;
-            color: white;
-            text-align: left;
-            padding: 16px;
-            font-size: 14px;
-            font-weight: 600;
-        }}
-        td {{
-            padding: 16px;
-            border-bottom: 1px solid #E0E0E0;
-            font-size: 14px;
-            line-height: 1.4;
-        }}
-        .company-header {{
-            background-color: #F5F5F5;
-            font-weight: 600;
-            padding: 16px;
-            font-size: 16px;
-            color: #1A1A1A;
-        }}
-        .apply-button {{
-            background-color: #43b548;
-            color: white !important;
-            padding: 10px 20px;
-            text-decoration: none;
-            border-radius: 6px;
-            display: inline-block;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.2s ease;
-            border: none;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            text-align: center;
-            min-width: 100px;
-        }}
-        .apply-button:visited {{
-            color: white !important;
-        }}
-        .apply-button:hover {{
-            background-color: #1B5E20;
-            box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-            transform: translateY(-1px);
-        }}
-        tr:hover {{
-            background-color: #F9F9F9;
-        }}
-    </style>
-    </head>
-    <body>
-    {intro}
-    <table>
-        <tr>
-            <th>Title</th>
-            <th>Location</th>
-            <th>Job Link</th>
-        </tr>
-    """
-    
-    # Group jobs by company
-    companies = {}
-    for job in jobs:
-        if job['company'] not in companies:
-            companies[job['company']] = []
-        companies[job['company']].append(job)
-    
-    # Add jobs to table, grouped by company
-    for company in sorted(companies.keys()):
-        html += f"""
-        <tr>
-            <td colspan="3" class="company-header">{company}</td>
-        </tr>
-        """
-        for job in companies[company]:
-            html += f"""
-            <tr>
-                <td>{job['title']}</td>
-                <td>{job['location']}</td>
-                <td><a href="{job['url']}" class="apply-button">Apply Now</a></td>
-            </tr>
-            """
-    
-    html += """
-    </table>
-    </body>
-    </html>
+def scrape_jobs():
+    """Scrape every board, store new jobs and notify users in a single process"""
+    scraped, total_jobs_found = collect_jobs(get_boards())
+    process_jobs(scraped, total_jobs_found)
+
+def scrape_shard(index, count):
+    """Scrape this shard's boards and write them to a shard results file for the merge step"""
+    boards = shard_boards(get_boards(), index, count)
+    print(f"Shard {index}/{count}: {len(boards)} boards")
+    scraped, total_jobs_found = collect_jobs(boards)
+    # The merge step saves the validators of the boards fetched here once their jobs are stored
+    path = write_shard_results(index, count, scraped, total_jobs_found, fetched_validators())
+    print(f"Wrote {len(scraped)} jobs to {path}")
+    # Board health and classification caches are shard-local
+    save_board_health()
+    save_title_cache()
+    save_location_cache()
+
+def merge_shards(results_dir):
+    """Merge every shard's results, then store new jobs and notify users once"""
+    scraped, total_jobs_found, validators = read_shard_results(results_dir)
+    print(f"Merged {len(scraped)} unique jobs from {results_dir}")
+    # Saved with the response cache only after process_jobs stores the jobs
+    add_validators(validators)
+    process_jobs(scraped, total_jobs_found)
+
+def compact_jobs(ttl_days=JOB_TTL_DAYS):
+    """Archive jobs older than ttl_days to gzipped NDJSON, tombstone their IDs, then delete them
+
+    Tombstoned IDs still count as known when deduping, so an archived job
+    is never announced again.
     """
-    return html
+    storage = get_storage()
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=ttl_days)
+    os.makedirs(JOB_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(JOB_ARCHIVE_DIR, f"jobs-{now:%Y%m%dT%H%M%SZ}.ndjson.gz")
+
+    keys = []
+    job_ids = []
+    with gzip.open(path, 'wt', encoding='utf-8') as archive:
+        for key, job_doc in storage.iter_jobs_before(cutoff):
+            archive.write(json.dumps(job_doc, default=json_default) + '\n')
+            keys.append(key)
+            if job_doc.get('job_id'):
+                job_ids.append(job_doc['job_id'])
+    if not keys:
+        os.remove(path)
+        print(f"No jobs older than {ttl_days:g} days to compact")
+        return
+
+    # Tombstones are written before the deletes, so an interrupted run can't forget an ID
+    storage.add_tombstones(job_ids)
+    storage.delete_jobs(keys)
+    print(f"Archived {len(keys)} jobs older than {ttl_days:g} days to {path} and deleted them")
+
+def build_email_message(jobs, recipient_email, user_name=None, renderer=None):
+    """The notification email for a user's matching jobs, or the 'no new positions' email
 
-def send_email_notification(jobs, recipient_email, user_name=None):
+    Pass the run's EmailRenderer so job rows and company blocks are shared across users.
+    """
+    renderer = renderer or EmailRenderer()
     sender_email = os.getenv('EMAIL_USER')
-    sender_password = os.getenv('EMAIL_PASSWORD')
     msg = MIMEMultipart('alternative')
     msg['From'] = sender_email
     msg['To'] = recipient_email
     if jobs:
         msg['Subject'] = f"DEV - PingMeJobs Found {len(jobs)} positions"
         # Create both plain text and HTML versions
-        text_content = (
-            f"Hi {user_name},\n\n"
-            f"We're always on the lookout for the freshest roles, so you don't have to be.\n"
-            f"Here are roles that PingMeJobs found in the last 6 hours that match your preferences.\n"
-            f"Check them out and apply early to get ahead of the crowd!\n\n"
-        )
-        for job in jobs:
-            text_content += f"Company: {job['company']}\n"
-            text_content += f"Position: {job['title']}\n"
-            text_content += f"Location: {job['location']}\n"
-            text_content += f"Apply: {job['url']}\n"
-            text_content += "-" * 50 + "\n\n"
-        html_content = create_html_table(jobs, user_name)
-        msg.attach(MIMEText(text_content, 'plain'))
-        msg.attach(MIMEText(html_content, 'html'))
+        msg.attach(MIMEText(renderer.text(jobs, user_name), 'plain'))
+        msg.attach(MIMEText(renderer.html(jobs, user_name), 'html'))
     else:
         msg['Subject'] = "Jobs Update DEV - No New Positions"
         body = "No new positions were updated in the last 6 hours that match your preferences. We'll keep looking 👀\n\n"
         body += "Keep checking back for new opportunities!"
         msg.attach(MIMEText(body, 'plain'))
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.send_message(msg)
-        server.quit()
-        print(f"Email notification sent successfully to {recipient_email}!")
-    except Exception as e:
-        print(f"Error sending email to {recipient_email}: {str(e)}")
+    return msg
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Scrape job boards and email matching jobs to users")
+    mode = arg_parser.add_mutually_exclusive_group()
+    mode.add_argument('--shard', metavar='I/N',
+                      help="Only scrape shard I of N and write its results for a later --merge")
+    mode.add_argument('--merge', metavar='DIR', nargs='?', const=SHARD_RESULTS_DIR,
+                      help=f"Merge shard results from DIR (default {SHARD_RESULTS_DIR}), then store and notify")
+    mode.add_argument('--rebuild-seen-index', action='store_true',
+                      help="Rebuild the local seen-jobs index from the jobs collection and exit")
+    mode.add_argument('--compact', action='store_true',
+                      help=f"Archive and delete jobs older than --ttl-days to {JOB_ARCHIVE_DIR}/, keeping their IDs")
+    arg_parser.add_argument('--ttl-days', type=float, default=JOB_TTL_DAYS,
+                            help=f"Age in days after which --compact archives a job (default {JOB_TTL_DAYS:g})")
+    args = arg_parser.parse_args()
+    if args.shard:
+        try:
+            shard_index, shard_count = parse_shard_spec(args.shard)
+        except ValueError as e:
+            arg_parser.error(str(e))
+    
     print("Starting job scraper...")
-    scrape_jobs()
-    print("Job scraping completed!") 
\ No newline at end of file
+    try:
+        if args.rebuild_seen_index:
+            rebuild_seen_index()
+        elif args.compact:
+            compact_jobs(args.ttl_days)
+        elif args.shard:
+            enable_response_cache()
+            enable_board_health()
+            scrape_shard(shard_index, shard_count)
+        elif args.merge:
+            enable_response_cache()
+            merge_shards(args.merge)
+        else:
+            enable_response_cache()
+            enable_board_health()
+            scrape_jobs()
+    finally:
+        close_sessions()
+        close_storage()
+    print("Job scraping completed!")
@@ -1,10 +1,9 @@
-import requests
 from datetime import datetime, timezone, timedelta
 import time
-import re
 from dateutil.tz import tzutc
-from analyze_locations import identify_country
-from greenhouse_scraper import get_role_type, get_experience_level
+from analyze_locations import job_countries
+from title_classifier import classify_titles
+import http_client
 import csv
 import json
 import os
@@ -23,18 +22,20 @@ def scrape_lever_jobs(company_name, lever_subdomain):
     """
     url = f"https://api.lever.co/v0/postings/{lever_subdomain}?mode=json"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        jobs_data = response.json()
+        jobs_data = http_client.fetch_board_json(url)
     except Exception as e:
         print(f"Error fetching jobs for {company_name}: {e}")
         return []
+    if jobs_data is None:
+        # Board is unchanged since the last run, so none of its jobs are new
+        return []
 
     processed_jobs = []
     now = datetime.now(tz=tzutc())
     # last_6h = now - timedelta(hours=6)
     last_72h = now - timedelta(hours=72)
-    for job in jobs_data:
+    classifications = classify_titles((job.get('text', 'N/A') for job in jobs_data), 'greenhouse')
+    for job, (role_type, experience_level) in zip(jobs_data, classifications):
         # Use updatedAt if available, else fallback to createdAt
         updated_at_ms = job.get('updatedAt') or job.get('createdAt')
         if not updated_at_ms:
@@ -43,40 +44,10 @@ def scrape_lever_jobs(company_name, lever_subdomain):
         if updated_at <= last_72h:
             continue
         title = job.get('text', 'N/A')
-        role_type = get_role_type(title)
         if not role_type:
             continue
-        experience_level = get_experience_level(title)
         department = job.get('categories', {}).get('team', 'N/A')
         location = job.get('categories', {}).get('location', 'N/A')
-        # Handle multiple locations (separated by semicolons)
-        if ';' in location:
-            locations = [loc.strip() for loc in location.split(';')]
-            countries = set()
-            for loc in locations:
-                if 'remote' in loc.lower():
-                    countries.add('Remote')
-                    loc = re.sub(r'remote,?\s*', '', loc, flags=re.IGNORECASE).strip()
-                    if loc:
-                        country = identify_country(loc)
-                        if country != 'Unknown':
-                            countries.add(country)
-                else:
-                    country = identify_country(loc)
-                    if country != 'Unknown':
-                        countries.add(country)
-        else:
-            if 'remote' in location.lower():
-                countries = {'Remote'}
-                loc = re.sub(r'remote,?\s*', '', location, flags=re.IGNORECASE).strip()
-                if loc:
-                    country = identify_country(loc)
-                    if country != 'Unknown':
-                        countries.add(country)
-            else:
-                country = identify_country(location)
-                countries = {country} if country != 'Unknown' else set()
-        countries_map = {str(i): country for i, country in enumerate(sorted(countries))}
         job_id = f"{company_name.lower()}_{job.get('id', 'N/A')}"
         url_ = job.get('hostedUrl', 'N/A')
         hours_ago = round((now - updated_at).total_seconds() / 3600, 1)
@@ -84,7 +55,7 @@ def scrape_lever_jobs(company_name, lever_subdomain):
             'company': company_name.title(),
             'title': title,
             'location': location,
-            'countries': countries_map,
+            'countries': job_countries(location),
             'department': department,
             'job_id': job_id,
             'hours_ago': hours_ago,
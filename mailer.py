@@ -0,0 +1,151 @@
+import os
+import queue
+import smtplib
+import threading
+from email.message import Message
+from typing import Optional
+
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+
+# Set SMTP_STARTTLS=0 to talk plain SMTP, e.g. to a local stand-in server
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', '1') != '0'
+
+# Open connections kept by a pool, and messages sent over one before it is replaced
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '2'))
+SMTP_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MESSAGES_PER_CONNECTION', '50'))
+
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+
+# Set SMTP_DRY_RUN=1 to render and queue emails without connecting to a server
+SMTP_DRY_RUN = os.getenv('SMTP_DRY_RUN', '0') != '0'
+
+# Errors after which a connection is dropped and the message retried on a fresh one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError)
+
+class SMTPPool:
+    """Authenticated SMTP connections reused across messages
+
+    Up to size connections are opened on demand and shared by the threads
+    calling send(). A connection is replaced after max_messages sends, and
+    one that fails is dropped and the message retried once on a new
+    connection. Messages the server refuses for their recipients are not
+    retried.
+    """
+
+    dry_run = False
+
+    def __init__(self, user: Optional[str] = None, password: Optional[str] = None,
+                 host: str = SMTP_HOST, port: int = SMTP_PORT, starttls: bool = SMTP_STARTTLS,
+                 size: int = SMTP_POOL_SIZE, max_messages: int = SMTP_MESSAGES_PER_CONNECTION,
+                 timeout: float = SMTP_TIMEOUT):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.max_messages = max_messages
+        self.timeout = timeout
+        # Each slot holds an open [connection, messages sent] pair, or None until first use
+        self._slots: 'queue.Queue' = queue.Queue()
+        for _ in range(max(1, size)):
+            self._slots.put(None)
+        self._open = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def __enter__(self) -> 'SMTPPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connect(self) -> list:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except BaseException:
+            self._quit(server)
+            raise
+        self.connections_opened += 1
+        slot = [server, 0]
+        with self._lock:
+            self._open.append(slot)
+        return slot
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _discard(self, slot: list) -> None:
+        with self._lock:
+            self._open = [open_slot for open_slot in self._open if open_slot is not slot]
+        self._quit(slot[0])
+
+    def send(self, msg: Message) -> None:
+        """Send a message over a pooled connection, reconnecting once if the connection fails"""
+        slot = self._slots.get()
+        try:
+            if slot is not None and slot[1] >= self.max_messages:
+                self._discard(slot)
+                slot = None
+            for attempt in range(2):
+                if slot is None:
+                    slot = self._connect()
+                try:
+                    slot[0].send_message(msg)
+                    slot[1] += 1
+                    return
+                except smtplib.SMTPRecipientsRefused:
+                    raise
+                except RECONNECT_ERRORS:
+                    self._discard(slot)
+                    slot = None
+                    if attempt:
+                        raise
+        finally:
+            self._slots.put(slot)
+
+    def close(self) -> None:
+        """Quit every open connection once sending is done; the pool reconnects if used again"""
+        with self._lock:
+            slots, self._open = self._open, []
+        for slot in slots:
+            self._quit(slot[0])
+        size = self._slots.qsize()
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+
+class DryRunMailer:
+    """Stands in for SMTPPool and accepts every message without sending it
+
+    Used for load tests against synthetic users, so their addresses are
+    never mailed. Messages are not rate limited.
+    """
+
+    dry_run = True
+
+    def __init__(self):
+        self.connections_opened = 0
+        self.messages_accepted = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'DryRunMailer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def send(self, msg: Message) -> None:
+        with self._lock:
+            self.messages_accepted += 1
+
+    def close(self) -> None:
+        pass
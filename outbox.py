@@ -0,0 +1,136 @@
+import email
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from disk_cache import CACHE_DIR, cache_path
+from mailer import SMTP_POOL_SIZE
+from rate_limiter import TokenBucket
+
+OUTBOX_FILE = 'outbox.sqlite'
+
+# Global send rate across all workers, and the number of sender threads
+EMAIL_RATE_PER_MINUTE = float(os.getenv('EMAIL_RATE_PER_MINUTE', '300'))
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', str(SMTP_POOL_SIZE)))
+
+# Runs that try a message before giving up on it
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '3'))
+
+# Sent messages older than this are purged when the outbox is opened
+OUTBOX_KEEP_SENT_DAYS = float(os.getenv('OUTBOX_KEEP_SENT_DAYS', '7'))
+
+# Pending messages loaded per page while draining
+OUTBOX_PAGE_SIZE = 200
+
+# SMTP replies that mean the server is throttling us rather than rejecting the message
+THROTTLE_CODES = {421, 450, 451, 452}
+
+class Outbox:
+    """Durable queue of rendered emails in .cache/outbox.sqlite
+
+    Messages are stored as their full MIME text, so delivering them again
+    after a crash needs no re-rendering. drain() sends pending messages and
+    marks each one sent as soon as the server accepts it, so a restarted run
+    picks up exactly the messages that were not delivered.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = cache_path(OUTBOX_FILE)
+        # Sender threads mark messages through the same connection, one at a time
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, recipient TEXT, mime TEXT, '
+                "status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, last_error TEXT, "
+                'created REAL, sent REAL)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS messages_status ON messages (status, id)')
+            self.conn.execute("DELETE FROM messages WHERE status = 'sent' AND sent < ?",
+                              (time.time() - OUTBOX_KEEP_SENT_DAYS * 86400,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue(self, messages: Iterable[Tuple[str, str]]) -> int:
+        """Queue (recipient, MIME text) pairs in one transaction and return how many were queued"""
+        now = time.time()
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany('INSERT INTO messages (recipient, mime, created) VALUES (?, ?, ?)',
+                                  ((recipient, mime, now) for recipient, mime in messages))
+            return self.conn.total_changes - before
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM messages WHERE status = 'pending'").fetchone()[0]
+
+    def _pending_page(self, after_id: int) -> List[Tuple[int, str, str]]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, recipient, mime FROM messages WHERE status = 'pending' AND id > ? ORDER BY id LIMIT ?",
+                (after_id, OUTBOX_PAGE_SIZE),
+            ).fetchall()
+
+    def mark_sent(self, message_id: int) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE messages SET status = 'sent', sent = ? WHERE id = ?", (time.time(), message_id))
+
+    def mark_failed(self, message_id: int, error: str, permanent: bool = False) -> None:
+        """Record a failed attempt; the message stays pending until OUTBOX_MAX_ATTEMPTS or a permanent failure"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE messages SET attempts = attempts + 1, last_error = ?, "
+                "status = CASE WHEN ? OR attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE id = ?",
+                (error, permanent, OUTBOX_MAX_ATTEMPTS, message_id),
+            )
+
+    def drain(self, mailer, workers: int = OUTBOX_WORKERS, limiter: Optional[TokenBucket] = None) -> Tuple[int, int]:
+        """Send every pending message with a pool of workers, at most EMAIL_RATE_PER_MINUTE overall
+
+        Messages that fail stay queued for the next run, and a dry-run mailer
+        is not rate limited. Returns (sent, failed).
+        """
+        if limiter is None and not mailer.dry_run:
+            limiter = TokenBucket(EMAIL_RATE_PER_MINUTE / 60)
+
+        def deliver(row: Tuple[int, str, str]) -> bool:
+            message_id, recipient, mime = row
+            if limiter:
+                limiter.acquire()
+            try:
+                mailer.send(email.message_from_string(mime))
+            except smtplib.SMTPRecipientsRefused as e:
+                self.mark_failed(message_id, str(e), permanent=True)
+                print(f"Error sending email to {recipient}: {e}")
+                return False
+            except (smtplib.SMTPException, OSError) as e:
+                if limiter and isinstance(e, smtplib.SMTPResponseException) and e.smtp_code in THROTTLE_CODES:
+                    limiter.record_response(429)
+                self.mark_failed(message_id, str(e))
+                print(f"Error sending email to {recipient}: {e}")
+                return False
+            if limiter:
+                limiter.record_response(250)
+            self.mark_sent(message_id)
+            print(f"Email notification sent successfully to {recipient}!")
+            return True
+
+        sent = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            while True:
+                page = self._pending_page(last_id)
+                if not page:
+                    break
+                last_id = page[-1][0]
+                for delivered in executor.map(deliver, page):
+                    sent += delivered
+                    failed += not delivered
+        return sent, failed
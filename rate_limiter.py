@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from fetch_engine import ASHBY_HOST
+
+# Requests per second allowed per host when responses are clean
+DEFAULT_RATE = float(os.getenv('SCRAPER_RATE_LIMIT', '10'))
+HOST_RATES = {
+    ASHBY_HOST: float(os.getenv('SCRAPER_ASHBY_RATE_LIMIT', '4')),
+}
+
+# Floor for the backed-off rate and the longest Retry-After we will honour
+MIN_RATE = 0.2
+MAX_RETRY_AFTER = 120.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to throttling responses
+
+    The rate is halved on HTTP 429 (and any Retry-After pause is honoured),
+    then raised again by a small step for every second's worth of clean
+    responses until it is back at max_rate.
+    """
+
+    def __init__(self, max_rate: float, burst: Optional[float] = None, step: Optional[float] = None):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.capacity = burst or max(1.0, max_rate)
+        self.step = step or max(MIN_RATE, max_rate / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.clean_streak = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def record_response(self, status_code: int, retry_after: Optional[float] = None) -> None:
+        """Adapt the rate to a response from this host"""
+        with self._lock:
+            if status_code == 429 or (status_code == 503 and retry_after is not None):
+                self.rate = max(MIN_RATE, self.rate / 2)
+                self.tokens = 0.0
+                self.clean_streak = 0
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif status_code < 500:
+                self.clean_streak += 1
+                if self.rate < self.max_rate and self.clean_streak >= self.rate:
+                    self.rate = min(self.max_rate, self.rate + self.step)
+                    self.clean_streak = 0
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(host: str) -> TokenBucket:
+    """Shared rate limiter for a provider host, created on first use"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucket(HOST_RATES.get(host, DEFAULT_RATE))
+            _limiters[host] = limiter
+        return limiter
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+from typing import Iterable, Set
+
+from disk_cache import CACHE_DIR, cache_path
+from storage import SQLITE_VARIABLE_LIMIT, chunked
+
+SEEN_JOBS_FILE = 'seen_jobs.sqlite'
+
+class SeenJobsIndex:
+    """Local set of job_ids known to be stored, kept in front of Firestore
+
+    A job_id in the index was stored by an earlier run, so it is definitely
+    seen and needs no Firestore lookup. A job_id missing from the index may
+    still be stored (an index lost with the workflow cache, or jobs added by
+    another process), so those are confirmed against Firestore and the
+    answers are recorded here. The index only ever holds IDs that were
+    confirmed or written, so it has no false positives; stats() reports how
+    often Firestore still knew an ID the index missed.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = cache_path(SEEN_JOBS_FILE)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS seen_jobs (job_id TEXT PRIMARY KEY)')
+        self.local_hits = 0
+        self.remote_checks = 0
+        self.remote_hits = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM seen_jobs').fetchone()[0]
+
+    def seen(self, job_ids: Iterable[str]) -> Set[str]:
+        """The subset of job_ids recorded in the index"""
+        found = set()
+        for chunk in chunked(list(job_ids), SQLITE_VARIABLE_LIMIT):
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(f'SELECT job_id FROM seen_jobs WHERE job_id IN ({placeholders})', chunk)
+            found.update(row[0] for row in rows)
+        self.local_hits += len(found)
+        return found
+
+    def add(self, job_ids: Iterable[str]) -> None:
+        """Record job_ids as stored"""
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO seen_jobs (job_id) VALUES (?)',
+                                  ((job_id,) for job_id in job_ids))
+
+    def record_remote_check(self, checked: int, already_stored: int) -> None:
+        """Count IDs sent to the database and how many of them it already had"""
+        self.remote_checks += checked
+        self.remote_hits += already_stored
+
+    def rebuild(self, job_ids: Iterable[str]) -> int:
+        """Replace the index with job_ids, typically every job_id in the jobs collection"""
+        with self.conn:
+            self.conn.execute('DELETE FROM seen_jobs')
+            self.conn.executemany('INSERT OR IGNORE INTO seen_jobs (job_id) VALUES (?)',
+                                  ((job_id,) for job_id in job_ids))
+        return len(self)
+
+    def stats(self) -> str:
+        """One-line summary of local answers and the index miss rate for this run"""
+        miss_rate = self.remote_hits / self.remote_checks if self.remote_checks else 0.0
+        return (f"Seen-jobs index: {self.local_hits} IDs answered locally, {self.remote_checks} sent to the "
+                f"database, {self.remote_hits} of those already stored (miss rate {miss_rate:.1%}, "
+                f"false positives 0)")
@@ -0,0 +1,97 @@
+import glob
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Directory where shard runs write their results for the merge step
+SHARD_RESULTS_DIR = os.getenv('SHARD_RESULTS_DIR', 'shard_results')
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """Parse an 'i/n' shard spec (1 <= i <= n) into (i, n)"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/n such as 2/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', expected 1 <= i <= n")
+    return index, count
+
+def board_shard(provider: str, board_token: str, count: int) -> int:
+    """Stable 1-based shard number for a board, the same on every machine and run"""
+    return zlib.crc32(f"{provider}:{board_token}".encode('utf-8')) % count + 1
+
+def shard_boards(boards: List[Tuple[str, str, str]], index: int, count: int) -> List[Tuple[str, str, str]]:
+    """The (provider, company_name, board_token) boards that belong to shard index of count"""
+    return [board for board in boards if board_shard(board[0], board[2], count) == index]
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode(value: Dict):
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+def shard_results_path(index: int, count: int, results_dir: str = SHARD_RESULTS_DIR) -> str:
+    return os.path.join(results_dir, f"shard-{index}-of-{count}.json")
+
+def write_shard_results(index: int, count: int, scraped: List[Tuple[str, Dict]], total_jobs_found: int,
+                        validators: Optional[Dict[str, Dict]] = None, results_dir: str = SHARD_RESULTS_DIR) -> str:
+    """Write a shard's (provider, job) results for the merge step and return the file path
+
+    validators are the response cache entries of the boards the shard
+    fetched, which the merge step saves once the jobs are stored.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    path = shard_results_path(index, count, results_dir)
+    payload = {
+        'shard': f"{index}/{count}",
+        'total_jobs_found': total_jobs_found,
+        'validators': validators or {},
+        'jobs': [{'provider': provider, 'job': job} for provider, job in scraped],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, default=_encode)
+    return path
+
+def read_shard_results(
+    results_dir: str = SHARD_RESULTS_DIR,
+) -> Tuple[List[Tuple[str, Dict]], int, Dict[str, Dict]]:
+    """Read every shard file in results_dir and merge them
+
+    Returns (provider, job) pairs deduplicated by job_id, in shard order,
+    the total number of jobs the shards found, and the response cache
+    validators of every board the shards fetched.
+    """
+    paths = sorted(glob.glob(os.path.join(results_dir, 'shard-*-of-*.json')))
+    if not paths:
+        raise FileNotFoundError(f"No shard results found in {results_dir}")
+
+    counts = set()
+    seen_ids = set()
+    merged = []
+    total_jobs_found = 0
+    validators = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f, object_hook=_decode)
+        counts.add(payload['shard'].split('/')[1])
+        total_jobs_found += payload['total_jobs_found']
+        validators.update(payload.get('validators', {}))
+        for entry in payload['jobs']:
+            job = entry['job']
+            if job['job_id'] in seen_ids:
+                continue
+            seen_ids.add(job['job_id'])
+            merged.append((entry['provider'], job))
+
+    if len(counts) > 1:
+        raise ValueError(f"Shard results in {results_dir} come from different shard counts: {sorted(counts)}")
+    expected = int(counts.pop())
+    if len(paths) != expected:
+        print(f"Warning: merging {len(paths)} of {expected} shard results")
+    return merged, total_jobs_found, validators
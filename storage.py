@@ -0,0 +1,466 @@
+"""Storage backends for jobs and users.
+
+The scraper talks to a Storage: FirestoreStorage in production, or
+SQLiteStorage, a local stand-in for offline profiling and load tests.
+STORAGE_BACKEND picks one. Seed the local store with synthetic data with
+`python storage.py --seed-users 10000 --seed-jobs 50000`.
+"""
+import abc
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from disk_cache import cache_path
+
+# 'firestore' or 'sqlite'
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'firestore')
+
+SQLITE_STORAGE_PATH = os.getenv('SQLITE_STORAGE_PATH', cache_path('storage.sqlite'))
+
+FIREBASE_CREDS_PATH = 'config/firebase-adminsdk-fbsvc-9318d491d4.json' #ac74291157
+
+# Firestore caps the number of values in an 'in' filter and of writes in a batch
+FIRESTORE_IN_LIMIT = 30
+FIRESTORE_BATCH_LIMIT = 500
+
+# SQLite caps the number of bound parameters per statement
+SQLITE_VARIABLE_LIMIT = 900
+
+# Job IDs per job_tombstones document, well under Firestore's 1 MiB document limit
+TOMBSTONES_PER_DOC = 15000
+
+# User fields the notification step reads; select() fetches only these
+USER_FIELDS = ['email', 'name', 'preferences', 'jobTypes', 'experienceLevels', 'locationPreferences',
+               'deliveryPolicy', 'digestEveryRuns']
+
+def chunked(items, size):
+    """Consecutive slices of items with at most size elements each"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def first_name(name):
+    """First word of a user's name, or 'there' when it is blank"""
+    name = (name or '').strip()
+    return name.split()[0] if name else 'there'
+
+def user_record(user_data: Dict) -> Optional[Dict]:
+    """The {'email', 'name', 'preferences', 'delivery'} record of a verified user, or None without preferences or email
+
+    delivery holds the user's own 'policy' and 'every_runs', None where unset.
+    """
+    preferences = user_data.get('preferences', [])
+    email = user_data.get('email')
+    if not preferences or not email:
+        return None
+    return {
+        'email': email,
+        'name': first_name(user_data.get('name')),
+        'preferences': {
+            'companies': preferences,
+            'jobTypes': user_data.get('jobTypes', []),  # Default to empty array if not specified
+            'experienceLevels': user_data.get('experienceLevels', []),  # Get experience level preferences
+            'locationPreferences': user_data.get('locationPreferences', [])  # Get location preferences
+        },
+        'delivery': {
+            'policy': user_data.get('deliveryPolicy'),
+            'every_runs': user_data.get('digestEveryRuns'),
+        },
+    }
+
+def print_write_throughput(count: int, batches: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {count} jobs in {batches} batches "
+          f"({count / elapsed if elapsed else count:.0f} writes/sec)")
+
+class Storage(abc.ABC):
+    """Where jobs and users live; the scraper only uses these methods"""
+
+    @abc.abstractmethod
+    def known_job_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        """The subset of job_ids already stored"""
+
+    @abc.abstractmethod
+    def upsert_jobs(self, job_docs: List[Dict]) -> None:
+        """Store job documents keyed by job_id, replacing any with the same job_id"""
+
+    @abc.abstractmethod
+    def iter_users(self) -> Iterator[Dict]:
+        """Stream verified users with an email and preferences, once per email, as user_record()s"""
+
+    @abc.abstractmethod
+    def iter_job_ids(self) -> Iterator[str]:
+        """Stream the job_id of every stored or tombstoned job"""
+
+    @abc.abstractmethod
+    def iter_jobs_before(self, cutoff: datetime) -> Iterator[Tuple[str, Dict]]:
+        """Stream (key, job document) for jobs last updated before cutoff; key is what delete_jobs takes"""
+
+    @abc.abstractmethod
+    def delete_jobs(self, keys: List[str]) -> None:
+        """Delete jobs by the keys iter_jobs_before returned"""
+
+    @abc.abstractmethod
+    def add_tombstones(self, job_ids: Iterable[str]) -> None:
+        """Remember job_ids of deleted jobs so known_job_ids keeps reporting them"""
+
+    @abc.abstractmethod
+    def iter_pending_digests(self) -> Iterator[Tuple[str, Dict]]:
+        """Stream (email, {'runs', 'jobs'}) for every user with matches held back for a digest"""
+
+    @abc.abstractmethod
+    def save_pending_digests(self, digests: Dict[str, Optional[Dict]]) -> None:
+        """Replace each email's pending digest, or delete it where the value is None"""
+
+    def close(self) -> None:
+        pass
+
+def firestore_client():
+    """Initialize Firebase on first use and return a Firestore client"""
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        cred_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
+        if cred_json:
+            cred = credentials.Certificate(json.loads(cred_json))
+        else:
+            cred = credentials.Certificate(FIREBASE_CREDS_PATH)
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+class FirestoreStorage(Storage):
+    """The production store: the jobs and users collections in Firestore"""
+
+    def __init__(self):
+        self._db = None
+        self._tombstones = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = firestore_client()
+        return self._db
+
+    def known_job_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        """Query job_id with 'in' filters of up to FIRESTORE_IN_LIMIT ids, fetching only that field
+
+        Documents are matched on the job_id field, not the document ID,
+        because older documents were added with random IDs.
+        """
+        tombstones = self.load_tombstones()
+        job_ids = set(job_ids)
+        known = job_ids & tombstones
+        job_ids = sorted(job_ids - known)
+        for chunk in chunked(job_ids, FIRESTORE_IN_LIMIT):
+            docs = self.db.collection('jobs').where('job_id', 'in', chunk).select(['job_id']).get()
+            known.update(doc.get('job_id') for doc in docs)
+        print(f"Checked {len(job_ids)} job IDs against the database in "
+              f"{len(chunked(job_ids, FIRESTORE_IN_LIMIT))} queries: {len(known)} already stored or archived")
+        return known
+
+    @staticmethod
+    def document_id(key: str) -> str:
+        """Firestore document ID for a job_id or email; '/' would start a subcollection path"""
+        return key.replace('/', '%2F')
+
+    def upsert_jobs(self, job_docs: List[Dict]) -> None:
+        """Set each document in full under its job_id, in WriteBatches of up to FIRESTORE_BATCH_LIMIT"""
+        if not job_docs:
+            return
+        started = time.perf_counter()
+        jobs_collection = self.db.collection('jobs')
+        batches = chunked(job_docs, FIRESTORE_BATCH_LIMIT)
+        for chunk in batches:
+            batch = self.db.batch()
+            for job_doc in chunk:
+                document = jobs_collection.document(self.document_id(job_doc['job_id']))
+                batch.set(document, {**job_doc, 'added_to_db': firestore.SERVER_TIMESTAMP})
+            batch.commit()
+        print_write_throughput(len(job_docs), len(batches), started)
+
+    def iter_users(self) -> Iterator[Dict]:
+        """Stream users filtered on emailVerified on the server, fetching only USER_FIELDS"""
+        query = self.db.collection('users').where('emailVerified', '==', True).select(USER_FIELDS)
+        emails = set()
+        for user in query.stream():
+            record = user_record(user.to_dict())
+            if record and record['email'] not in emails:
+                emails.add(record['email'])
+                yield record
+
+    def iter_job_ids(self) -> Iterator[str]:
+        for doc in self.db.collection('jobs').select(['job_id']).stream():
+            job_id = doc.get('job_id')
+            if job_id:
+                yield job_id
+        yield from self.load_tombstones()
+
+    def iter_jobs_before(self, cutoff: datetime) -> Iterator[Tuple[str, Dict]]:
+        for doc in self.db.collection('jobs').where('last_updated', '<', cutoff).stream():
+            yield doc.id, doc.to_dict()
+
+    def delete_jobs(self, keys: List[str]) -> None:
+        jobs_collection = self.db.collection('jobs')
+        for chunk in chunked(keys, FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for key in chunk:
+                batch.delete(jobs_collection.document(key))
+            batch.commit()
+
+    def load_tombstones(self) -> Set[str]:
+        """Every tombstoned job_id, read once per run from the job_tombstones documents"""
+        if self._tombstones is None:
+            self._tombstones = set()
+            for doc in self.db.collection('job_tombstones').stream():
+                self._tombstones.update(doc.to_dict().get('job_ids', []))
+        return self._tombstones
+
+    def add_tombstones(self, job_ids: Iterable[str]) -> None:
+        """Append job_ids to the job_tombstones documents, TOMBSTONES_PER_DOC per document
+
+        The last document is topped up before new ones are started, so a
+        run reads len(tombstones) / TOMBSTONES_PER_DOC documents at most.
+        """
+        tombstones = self.load_tombstones()
+        new_ids = sorted(set(job_ids) - tombstones)
+        if not new_ids:
+            return
+        tombstones_collection = self.db.collection('job_tombstones')
+        docs = [(doc.id, len(doc.to_dict().get('job_ids', []))) for doc in tombstones_collection.stream()]
+        doc_id, size = max(docs) if docs else ('00000000', 0)
+        while new_ids:
+            if size >= TOMBSTONES_PER_DOC:
+                doc_id, size = f"{int(doc_id) + 1:08d}", 0
+            chunk, new_ids = new_ids[:TOMBSTONES_PER_DOC - size], new_ids[TOMBSTONES_PER_DOC - size:]
+            tombstones_collection.document(doc_id).set({'job_ids': firestore.ArrayUnion(chunk)}, merge=True)
+            size += len(chunk)
+            tombstones.update(chunk)
+
+    def iter_pending_digests(self) -> Iterator[Tuple[str, Dict]]:
+        for doc in self.db.collection('pending_digests').stream():
+            digest = doc.to_dict()
+            yield digest['email'], {'runs': digest.get('runs', 0), 'jobs': digest.get('jobs', [])}
+
+    def save_pending_digests(self, digests: Dict[str, Optional[Dict]]) -> None:
+        """One document per email in pending_digests, written in WriteBatches of up to FIRESTORE_BATCH_LIMIT"""
+        digests_collection = self.db.collection('pending_digests')
+        for chunk in chunked(sorted(digests), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for email in chunk:
+                document = digests_collection.document(self.document_id(email))
+                if digests[email] is None:
+                    batch.delete(document)
+                else:
+                    batch.set(document, {'email': email, **digests[email]})
+            batch.commit()
+
+def json_default(value):
+    """json.dumps default that writes datetimes as ISO strings"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class SQLiteStorage(Storage):
+    """A local single-file store with the same behavior as FirestoreStorage
+
+    Jobs and users are kept as JSON documents, with the fields used in
+    lookups (job_id, email, emailVerified) in their own indexed columns.
+    """
+
+    def __init__(self, path: str = SQLITE_STORAGE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, last_updated TEXT, doc TEXT)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS jobs_last_updated ON jobs (last_updated)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS job_tombstones (job_id TEXT PRIMARY KEY)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, email TEXT, '
+                              'email_verified INTEGER, doc TEXT)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS users_verified ON users (email_verified)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS pending_digests (email TEXT PRIMARY KEY, doc TEXT)')
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def known_job_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        job_ids = sorted(set(job_ids))
+        known = set()
+        for chunk in chunked(job_ids, SQLITE_VARIABLE_LIMIT):
+            placeholders = ','.join('?' * len(chunk))
+            for table in ('jobs', 'job_tombstones'):
+                rows = self.conn.execute(f'SELECT job_id FROM {table} WHERE job_id IN ({placeholders})', chunk)
+                known.update(row[0] for row in rows)
+        return known
+
+    def upsert_jobs(self, job_docs: List[Dict]) -> None:
+        if not job_docs:
+            return
+        started = time.perf_counter()
+        added_to_db = datetime.now(timezone.utc)
+        rows = []
+        for job_doc in job_docs:
+            job_doc = {**job_doc, 'added_to_db': added_to_db}
+            rows.append((
+                job_doc['job_id'],
+                self.timestamp_key(job_doc.get('last_updated')),
+                json.dumps(job_doc, default=json_default),
+            ))
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO jobs (job_id, last_updated, doc) VALUES (?, ?, ?)', rows)
+        print_write_throughput(len(job_docs), 1, started)
+
+    def iter_users(self) -> Iterator[Dict]:
+        emails = set()
+        for (doc,) in self.conn.execute('SELECT doc FROM users WHERE email_verified = 1 ORDER BY id'):
+            record = user_record(json.loads(doc))
+            if record and record['email'] not in emails:
+                emails.add(record['email'])
+                yield record
+
+    def iter_job_ids(self) -> Iterator[str]:
+        for (job_id,) in self.conn.execute('SELECT job_id FROM jobs UNION ALL SELECT job_id FROM job_tombstones'):
+            yield job_id
+
+    @staticmethod
+    def timestamp_key(value) -> Optional[str]:
+        """last_updated as a UTC ISO string, so that string order is time order"""
+        if not isinstance(value, datetime):
+            return value
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.replace(tzinfo=None).isoformat()
+
+    def iter_jobs_before(self, cutoff: datetime) -> Iterator[Tuple[str, Dict]]:
+        rows = self.conn.execute('SELECT job_id, doc FROM jobs WHERE last_updated < ?', (self.timestamp_key(cutoff),))
+        for job_id, doc in rows.fetchall():
+            yield job_id, json.loads(doc)
+
+    def delete_jobs(self, keys: List[str]) -> None:
+        with self.conn:
+            self.conn.executemany('DELETE FROM jobs WHERE job_id = ?', ((key,) for key in keys))
+
+    def add_tombstones(self, job_ids: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO job_tombstones (job_id) VALUES (?)',
+                                  ((job_id,) for job_id in job_ids))
+
+    def iter_pending_digests(self) -> Iterator[Tuple[str, Dict]]:
+        for email, doc in self.conn.execute('SELECT email, doc FROM pending_digests').fetchall():
+            yield email, json.loads(doc)
+
+    def save_pending_digests(self, digests: Dict[str, Optional[Dict]]) -> None:
+        with self.conn:
+            self.conn.executemany('DELETE FROM pending_digests WHERE email = ?',
+                                  ((email,) for email, digest in digests.items() if digest is None))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pending_digests (email, doc) VALUES (?, ?)',
+                ((email, json.dumps(digest, default=json_default)) for email, digest in digests.items()
+                 if digest is not None),
+            )
+
+    def add_users(self, users: Iterable[Dict]) -> None:
+        """Insert user documents shaped like the users collection"""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO users (email, email_verified, doc) VALUES (?, ?, ?)',
+                ((user.get('email'), 1 if user.get('emailVerified') is True else 0, json.dumps(user))
+                 for user in users),
+            )
+
+_storage: Optional[Storage] = None
+
+def get_storage() -> Storage:
+    """The Storage selected by STORAGE_BACKEND, created on first use"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == 'firestore':
+            _storage = FirestoreStorage()
+        elif STORAGE_BACKEND == 'sqlite':
+            _storage = SQLiteStorage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}', expected 'firestore' or 'sqlite'")
+    return _storage
+
+def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
+
+# Values synthetic users and jobs are drawn from, matching what the site lets users pick
+SYNTHETIC_ROLE_TYPES = ['product', 'program', 'data', 'business', 'scientist', 'bi', 'dataeng', 'swe', 'sre',
+                        'ml', 'uxresearcher', 'uidesigner']
+SYNTHETIC_EXPERIENCE_LEVELS = ['intern', 'junior', 'mid-level', 'senior']
+SYNTHETIC_LOCATIONS = ['any', 'Remote', 'United States', 'Canada', 'United Kingdom', 'India', 'Germany']
+# None leaves the user on DEFAULT_DELIVERY_POLICY
+SYNTHETIC_DELIVERY_POLICIES = [None, None, 'always', 'immediate', 'digest']
+
+def config_companies() -> List[str]:
+    """Lowercase company names from every provider config"""
+    companies = []
+    for provider in ('greenhouse', 'ashby', 'lever'):
+        with open(os.path.join('docs', f'{provider}_companies_config.json'), 'r') as f:
+            companies.extend(name.lower() for name in json.load(f)['companies'])
+    return companies
+
+def synthetic_users(count: int, rng: random.Random) -> Iterator[Dict]:
+    """User documents with random preferences; about 1 in 10 is unverified"""
+    companies = config_companies()
+    for i in range(count):
+        yield {
+            'email': f'user{i}@example.com',
+            'name': f'User{i} Synthetic',
+            'emailVerified': rng.random() >= 0.1,
+            'preferences': rng.sample(companies, rng.randint(1, 20)),
+            'jobTypes': rng.sample(SYNTHETIC_ROLE_TYPES, rng.randint(0, 3)),
+            'experienceLevels': rng.sample(SYNTHETIC_EXPERIENCE_LEVELS, rng.randint(0, 2)),
+            'locationPreferences': rng.sample(SYNTHETIC_LOCATIONS, rng.randint(0, 2)),
+            'deliveryPolicy': rng.choice(SYNTHETIC_DELIVERY_POLICIES),
+        }
+
+def synthetic_jobs(count: int, rng: random.Random) -> Iterator[Dict]:
+    """Job documents shaped like the scrapers' output, posted over the last 30 days"""
+    companies = config_companies()
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        company = rng.choice(companies)
+        yield {
+            'company': company.title(),
+            'title': f'Synthetic Role {i}',
+            'location': 'Remote',
+            'countries': {'0': rng.choice(SYNTHETIC_LOCATIONS[1:])},
+            'department': 'N/A',
+            'job_id': f'{company}_synthetic{i}',
+            'hours_ago': 0,
+            'url': f'https://example.com/jobs/{i}',
+            'role_type': rng.choice(SYNTHETIC_ROLE_TYPES),
+            'experience_level': rng.choice(SYNTHETIC_EXPERIENCE_LEVELS),
+            'last_updated': now - timedelta(hours=rng.uniform(0, 24 * 30)),
+        }
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Seed the local SQLite store with synthetic data")
+    arg_parser.add_argument('--seed-users', type=int, default=0, metavar='N', help="Add N synthetic users")
+    arg_parser.add_argument('--seed-jobs', type=int, default=0, metavar='N', help="Add N synthetic stored jobs")
+    arg_parser.add_argument('--random-seed', type=int, default=0, help="Seed for reproducible data")
+    arg_parser.add_argument('--path', default=SQLITE_STORAGE_PATH, help=f"SQLite file (default {SQLITE_STORAGE_PATH})")
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.random_seed)
+    store = SQLiteStorage(args.path)
+    try:
+        if args.seed_users:
+            store.add_users(synthetic_users(args.seed_users, rng))
+            print(f"Added {args.seed_users} synthetic users to {args.path}")
+        if args.seed_jobs:
+            store.upsert_jobs(list(synthetic_jobs(args.seed_jobs, rng)))
+    finally:
+        store.close()
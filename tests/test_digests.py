@@ -0,0 +1,125 @@
+"""Delivery policies over several runs, against SQLiteStorage and a DryRunMailer"""
+import email
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import job_scraper
+import storage
+from job_scraper import queue_notifications
+from mailer import DryRunMailer
+from outbox import Outbox
+from storage import SQLiteStorage
+
+def make_job(number, company='acme'):
+    return {
+        'company': company.title(),
+        'title': f'Software Engineer {number}',
+        'location': 'Remote',
+        'countries': {'0': 'Remote'},
+        'job_id': f'{company}_{number}',
+        'url': f'https://example.com/jobs/{number}',
+        'role_type': 'swe',
+        'experience_level': 'mid-level',
+    }
+
+def make_user(address, policy=None, every_runs=None):
+    return {
+        'email': address,
+        'name': 'Test User',
+        'emailVerified': True,
+        'preferences': ['acme'],
+        'deliveryPolicy': policy,
+        'digestEveryRuns': every_runs,
+    }
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SQLiteStorage(str(tmp_path / 'storage.sqlite'))
+    monkeypatch.setattr(storage, '_storage', store)
+    yield store
+    store.close()
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite'))
+    yield outbox
+    outbox.close()
+
+def run(outbox, jobs):
+    """Queue and send one run's emails; returns {recipient: job IDs in their email}"""
+    already_sent = {row[0] for row in outbox.conn.execute("SELECT id FROM messages")}
+    queue_notifications(outbox, jobs)
+    mailer = DryRunMailer()
+    sent, failed = outbox.drain(mailer)
+    assert (sent, failed) == (mailer.messages_accepted, 0)
+    emails = {}
+    for message_id, recipient, mime in outbox.conn.execute("SELECT id, recipient, mime FROM messages"):
+        if message_id in already_sent:
+            continue
+        text = email.message_from_string(mime).get_payload()[0].get_payload(decode=True).decode()
+        emails[recipient] = [f'acme_{number}' for number in re.findall(r'https://example.com/jobs/(\d+)', text)]
+    return emails
+
+def new_jobs(*numbers):
+    return [make_job(number) for number in numbers]
+
+def pending(store):
+    return dict(store.iter_pending_digests())
+
+def test_digest_sent_on_its_every_runs_run(store, outbox):
+    store.add_users([make_user('digest@example.com', 'digest', 3), make_user('now@example.com', 'immediate')])
+
+    assert run(outbox, new_jobs(1)) == {'now@example.com': ['acme_1']}
+    assert pending(store)['digest@example.com']['runs'] == 1
+
+    # A run without new matches still counts towards the digest
+    assert run(outbox, []) == {}
+    assert pending(store)['digest@example.com'] == {'runs': 2, 'jobs': [make_job(1)]}
+
+    assert run(outbox, new_jobs(2)) == {'digest@example.com': ['acme_1', 'acme_2'], 'now@example.com': ['acme_2']}
+    assert pending(store) == {}
+
+def test_digest_not_started_without_matches(store, outbox):
+    store.add_users([make_user('digest@example.com', 'digest', 2)])
+    assert run(outbox, []) == {}
+    assert pending(store) == {}
+
+def test_full_digest_sent_early(store, outbox, monkeypatch):
+    monkeypatch.setattr(job_scraper, 'DIGEST_MAX_JOBS', 3)
+    store.add_users([make_user('digest@example.com', 'digest', 10)])
+
+    assert run(outbox, new_jobs(1, 2)) == {}
+    assert run(outbox, new_jobs(3)) == {'digest@example.com': ['acme_1', 'acme_2', 'acme_3']}
+    assert pending(store) == {}
+
+def test_held_jobs_sent_after_leaving_digest_policy(store, outbox):
+    store.add_users([make_user('digest@example.com', 'digest', 5)])
+    assert run(outbox, new_jobs(1)) == {}
+
+    user = make_user('digest@example.com', 'immediate')
+    with store.conn:
+        store.conn.execute('UPDATE users SET doc = ?', (json.dumps(user),))
+    assert run(outbox, []) == {'digest@example.com': ['acme_1']}
+    assert pending(store) == {}
+
+def test_digest_dropped_for_users_who_are_gone(store, outbox):
+    store.add_users([make_user('gone@example.com', 'digest', 5), make_user('stays@example.com', 'digest', 5)])
+    assert run(outbox, new_jobs(1)) == {}
+    assert set(pending(store)) == {'gone@example.com', 'stays@example.com'}
+
+    with store.conn:
+        store.conn.execute("DELETE FROM users WHERE email = 'gone@example.com'")
+    assert run(outbox, []) == {}
+    assert set(pending(store)) == {'stays@example.com'}
+
+def test_unknown_default_policy_rejected_at_import():
+    env = {**os.environ, 'DEFAULT_DELIVERY_POLICY': 'weekly'}
+    result = subprocess.run([sys.executable, '-c', 'import job_scraper'], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode != 0
+    assert "Unknown DEFAULT_DELIVERY_POLICY 'weekly'" in result.stderr
@@ -0,0 +1,130 @@
+"""JobIndex against the per-user scan it replaced
+
+reference_filter is the old filter_jobs_for_user loop: every job is checked
+against each of the user's preferences in turn, an empty preference doesn't
+filter and 'any' among the location preferences accepts every location.
+"""
+import random
+
+import pytest
+
+from job_matcher import JobIndex, preference_signature
+
+def reference_filter(jobs, user_preferences):
+    filtered_jobs = []
+    for job in jobs:
+        if user_preferences.get('companies') and job['company'].lower() not in user_preferences['companies']:
+            continue
+        if user_preferences.get('jobTypes') and job['role_type'] not in user_preferences['jobTypes']:
+            continue
+        if user_preferences.get('experienceLevels') and job['experience_level'] not in user_preferences['experienceLevels']:
+            continue
+        if user_preferences.get('locationPreferences'):
+            if 'any' in user_preferences['locationPreferences']:
+                filtered_jobs.append(job)
+                continue
+            job_countries_list = list(job.get('countries', {}).values())
+            if not job_countries_list or not any(
+                country in user_preferences['locationPreferences'] for country in job_countries_list
+            ):
+                continue
+        filtered_jobs.append(job)
+    return filtered_jobs
+
+COMPANIES = ['Stripe', 'airbnb', 'OpenAI', 'notion', 'Figma']
+ROLE_TYPES = ['swe', 'data', 'product', 'sre', 'ml']
+EXPERIENCE_LEVELS = ['intern', 'entry', 'mid', 'senior']
+COUNTRIES = ['United States', 'Canada', 'Germany', 'India', 'Remote']
+
+def random_jobs(rng, count):
+    jobs = []
+    for number in range(count):
+        countries = rng.sample(COUNTRIES, rng.randint(0, 3))
+        job = {
+            'job_id': f'job_{number}',
+            'company': rng.choice(COMPANIES),
+            'role_type': rng.choice(ROLE_TYPES),
+            'experience_level': rng.choice(EXPERIENCE_LEVELS),
+        }
+        # Some jobs have no countries at all, others an empty mapping
+        if countries or rng.random() < 0.5:
+            job['countries'] = {f'location_{i}': country for i, country in enumerate(countries)}
+        jobs.append(job)
+    return jobs
+
+def random_preferences(rng):
+    def pick(values):
+        choice = rng.random()
+        if choice < 0.25:
+            return None
+        if choice < 0.4:
+            return []
+        # Duplicates and values no job has
+        return [rng.choice(values) for _ in range(rng.randint(1, 3))]
+    preferences = {
+        'companies': pick([company.lower() for company in COMPANIES] + ['Stripe', 'unknown']),
+        'jobTypes': pick(ROLE_TYPES + ['design']),
+        'experienceLevels': pick(EXPERIENCE_LEVELS),
+        'locationPreferences': pick(COUNTRIES + ['any', 'Japan']),
+    }
+    return {key: value for key, value in preferences.items() if value is not None}
+
+JOBS = [
+    {'job_id': 'a', 'company': 'Stripe', 'role_type': 'swe', 'experience_level': 'entry',
+     'countries': {'New York': 'United States'}},
+    {'job_id': 'b', 'company': 'airbnb', 'role_type': 'data', 'experience_level': 'mid',
+     'countries': {'Toronto': 'Canada', 'Remote': 'Remote'}},
+    {'job_id': 'c', 'company': 'OpenAI', 'role_type': 'swe', 'experience_level': 'senior'},
+    {'job_id': 'd', 'company': 'notion', 'role_type': 'product', 'experience_level': 'entry', 'countries': {}},
+]
+
+@pytest.mark.parametrize('preferences, expected', [
+    ({}, ['a', 'b', 'c', 'd']),
+    ({'companies': [], 'jobTypes': [], 'experienceLevels': [], 'locationPreferences': []}, ['a', 'b', 'c', 'd']),
+    # Job companies are lowercased, preferences are compared as stored
+    ({'companies': ['stripe', 'openai']}, ['a', 'c']),
+    ({'companies': ['Stripe']}, []),
+    # 'any' accepts jobs without countries too
+    ({'locationPreferences': ['any']}, ['a', 'b', 'c', 'd']),
+    ({'locationPreferences': ['Canada', 'any']}, ['a', 'b', 'c', 'd']),
+    ({'locationPreferences': ['Remote']}, ['b']),
+    ({'locationPreferences': ['United States', 'Canada'], 'jobTypes': ['swe']}, ['a']),
+    ({'jobTypes': ['swe'], 'experienceLevels': ['entry', 'senior']}, ['a', 'c']),
+    ({'jobTypes': ['design']}, []),
+])
+def test_match_edge_cases(preferences, expected):
+    assert [job['job_id'] for job in JobIndex(JOBS).match(preferences)] == expected
+    assert JobIndex(JOBS).match(preferences) == reference_filter(JOBS, preferences)
+
+def test_match_equals_reference_filter():
+    rng = random.Random(0)
+    for _ in range(20):
+        jobs = random_jobs(rng, rng.randint(0, 200))
+        index = JobIndex(jobs)
+        for _ in range(50):
+            preferences = random_preferences(rng)
+            assert index.match(preferences) == reference_filter(jobs, preferences), preferences
+
+def test_preference_signature_groups_equivalent_preferences():
+    same = [
+        {'companies': ['stripe', 'airbnb'], 'jobTypes': ['swe'], 'locationPreferences': ['Canada', 'any']},
+        {'companies': ['airbnb', 'stripe', 'stripe'], 'jobTypes': ['swe'], 'experienceLevels': [],
+         'locationPreferences': ['any']},
+    ]
+    assert preference_signature(same[0]) == preference_signature(same[1])
+    assert preference_signature({}) == preference_signature({'companies': [], 'locationPreferences': []})
+    assert preference_signature({'jobTypes': ['swe']}) != preference_signature({'jobTypes': ['data']})
+
+def test_preference_signature_implies_same_matches():
+    rng = random.Random(1)
+    jobs = random_jobs(rng, 300)
+    index = JobIndex(jobs)
+    by_signature = {}
+    for _ in range(2000):
+        preferences = random_preferences(rng)
+        by_signature.setdefault(preference_signature(preferences), []).append(preferences)
+    grouped = [group for group in by_signature.values() if len(group) > 1]
+    assert grouped
+    for group in grouped:
+        expected = index.match(group[0])
+        assert all(index.match(preferences) == expected for preferences in group[1:]), group
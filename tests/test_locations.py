@@ -0,0 +1,219 @@
+"""Location parity fixture: job board location strings and the countries they resolve to
+
+The strings are written the way Greenhouse, Ashby and Lever boards write them.
+Expected values match the pycountry-based resolver this replaced, except where
+that one was wrong ("UK" as Uganda, "SF" as Tunisia, "APAC" as the United States,
+"Berlin, DE" as the United States) or kept only one of several places joined by '/'.
+"""
+import pytest
+
+from analyze_locations import identify_country, job_countries, normalize_location
+
+BOARD_LOCATIONS = [
+    ('San Francisco, CA', 'United States'),
+    ('New York, NY', 'United States'),
+    ('New York City', 'United States'),
+    ('NYC', 'United States'),
+    ('Remote', 'Remote'),
+    ('Remote - US', 'Remote; United States'),
+    ('Remote, US', 'Remote; United States'),
+    ('US Remote', 'Remote; United States'),
+    ('Remote (United States)', 'Remote; United States'),
+    ('United States', 'United States'),
+    ('USA', 'United States'),
+    ('Seattle, WA', 'United States'),
+    ('Austin, TX', 'United States'),
+    ('Chicago, IL', 'United States'),
+    ('Boston, MA', 'United States'),
+    ('Los Angeles, California', 'United States'),
+    ('Palo Alto, California, United States', 'United States'),
+    ('Mountain View, CA; New York, NY', 'United States'),
+    ('San Francisco, CA; Remote', 'Remote; United States'),
+    ('Washington DC', 'United States'),
+    ('Washington, D.C.', 'United States'),
+    ('Atlanta, Georgia', 'United States'),
+    ('Denver, Colorado', 'United States'),
+    ('Miami, FL', 'United States'),
+    ('Toronto, Ontario, Canada', 'Canada'),
+    ('Toronto, ON', 'Canada'),
+    ('Vancouver, BC', 'Canada'),
+    ('Montreal, Quebec', 'Canada'),
+    ('Canada', 'Canada'),
+    ('Remote - Canada', 'Canada; Remote'),
+    ('Remote, CANADA', 'Canada; Remote'),
+    ('London, UK', 'United Kingdom'),
+    ('London, United Kingdom', 'United Kingdom'),
+    ('London', 'United Kingdom'),
+    ('Manchester, England', 'United Kingdom'),
+    ('Edinburgh, Scotland', 'United Kingdom'),
+    ('United Kingdom', 'United Kingdom'),
+    ('UK', 'United Kingdom'),
+    ('Dublin, Ireland', 'Ireland'),
+    ('Dublin', 'Ireland'),
+    ('Berlin, Germany', 'Germany'),
+    ('Berlin', 'Germany'),
+    ('Munich, Bavaria', 'Germany'),
+    ('Amsterdam, Netherlands', 'Netherlands'),
+    ('Amsterdam, NL', 'Netherlands'),
+    ('Paris, France', 'France'),
+    ('Madrid, Spain', 'Spain'),
+    ('Barcelona', 'Spain'),
+    ('Warsaw, Poland', 'Poland'),
+    ('Copenhagen', 'Denmark'),
+    ('Stockholm, Sweden', 'Sweden'),
+    ('Oslo, Norway', 'Norway'),
+    ('Helsinki, Finland', 'Finland'),
+    ('Zurich, Switzerland', 'Switzerland'),
+    ('Lisbon, Portugal', 'Portugal'),
+    ('Tel Aviv, Israel', 'Israel'),
+    ('Bangalore, India', 'India'),
+    ('Bengaluru, Karnataka, India', 'India'),
+    ('Hyderabad', 'India'),
+    ('Gurugram, Haryana', 'India'),
+    ('Mumbai', 'India'),
+    ('New Delhi, India', 'India'),
+    ('Chennai', 'India'),
+    ('Pune, India', 'India'),
+    ('Singapore', 'Singapore'),
+    ('Tokyo, Japan', 'Japan'),
+    ('Seoul, South Korea', 'Korea, Republic of'),
+    ('Taipei, Taiwan', 'Taiwan, Province of China'),
+    ('Taipei', 'Taiwan, Province of China'),
+    ('Sydney, Australia', 'Australia'),
+    ('Melbourne, VIC', 'Australia'),
+    ('Brisbane', 'Australia'),
+    ('Auckland, New Zealand', 'New Zealand'),
+    ('Mexico City, Mexico', 'Mexico'),
+    ('Mexico City', 'Mexico'),
+    ('Guadalajara', 'Mexico'),
+    ('Monterrey, NL', 'Mexico'),
+    ('São Paulo, Brazil', 'Brazil'),
+    ('Sao Paulo', 'Brazil'),
+    ('Buenos Aires, Argentina', 'Argentina'),
+    ('Bogotá, Colombia', 'Colombia'),
+    ('Santiago, Chile', 'Chile'),
+    ('Remote - EMEA', 'Remote'),
+    ('EMEA', 'Unknown'),
+    ('APAC', 'Unknown'),
+    ('LATAM', 'Unknown'),
+    ('Europe', 'Unknown'),
+    ('Remote, Europe', 'Remote'),
+    ('Hybrid - San Francisco Bay Area', 'United States'),
+    ('Bay Area', 'United States'),
+    ('SF Bay Area', 'United States'),
+    ('SF', 'United States'),
+    ('Anywhere', 'Unknown'),
+    ('N/A', 'N/A'),
+    ('Multiple Locations', 'Unknown'),
+    ('Headquarters', 'Unknown'),
+    ('New York, NY; London, UK; Remote', 'Remote; United Kingdom; United States'),
+    ('Remote - Germany', 'Germany; Remote'),
+    ('Remote (Poland)', 'Poland; Remote'),
+    ('Hong Kong', 'Hong Kong'),
+    ('Shanghai, China', 'China'),
+    ('Beijing', 'China'),
+    ('Dubai, UAE', 'United Arab Emirates'),
+    ('Riyadh, Saudi Arabia', 'Saudi Arabia'),
+    ('Cairo, Egypt', 'Egypt'),
+    ('Lagos, Nigeria', 'Nigeria'),
+    ('Nairobi, Kenya', 'Kenya'),
+    ('Cape Town, South Africa', 'South Africa'),
+    ('Istanbul, Turkey', 'Turkey'),
+    ('Prague, Czech Republic', 'Czechia'),
+    ('Budapest, Hungary', 'Hungary'),
+    ('Bucharest, Romania', 'Romania'),
+    ('Kyiv, Ukraine', 'Ukraine'),
+    ('Athens, Greece', 'Greece'),
+    ('Vienna, Austria', 'Austria'),
+    ('Brussels, Belgium', 'Belgium'),
+    ('Luxembourg', 'Luxembourg'),
+    ('Manila, Philippines', 'Philippines'),
+    ('Jakarta, Indonesia', 'Indonesia'),
+    ('Ho Chi Minh City, Vietnam', 'Viet Nam'),
+    ('Kuala Lumpur, Malaysia', 'Malaysia'),
+    ('Bangkok, Thailand', 'Thailand'),
+    ('Portland, OR', 'United States'),
+    ('Portland, Maine', 'United States'),
+    ('Raleigh-Durham, NC', 'United States'),
+    ('Research Triangle Park, NC', 'United States'),
+    ('Salt Lake City, UT', 'United States'),
+    ('Phoenix, AZ', 'United States'),
+    ('Pittsburgh, PA', 'United States'),
+    ('Philadelphia', 'United States'),
+    ('Sunnyvale', 'United States'),
+    ('San Jose', 'United States'),
+    ('Cambridge, MA', 'United States'),
+    ('Cambridge, UK', 'United Kingdom'),
+    ('Remote in United States', 'Remote; United States'),
+    ('United States - Remote', 'Remote; United States'),
+    ('US-Remote', 'Remote; United States'),
+    ('Remote-USA', 'Remote; United States'),
+    ('Remote (US/Canada)', 'Canada; Remote; United States'),
+    ('Remote - US & Canada', 'Canada; Remote; United States'),
+    ('New York / London', 'United Kingdom; United States'),
+    ('Remote/Hybrid', 'Remote'),
+    ('Berlin/Hybrid', 'Germany'),
+    ('Trinidad & Tobago', 'Trinidad and Tobago'),
+    ('North America', 'Unknown'),
+    ('In-Office - NYC', 'United States'),
+    ('Hybrid (New York)', 'United States'),
+    ('Field - US', 'United States'),
+    ('Field Sales - Chicago', 'United States'),
+    ('Ottawa', 'Canada'),
+    ('Calgary, AB', 'Canada'),
+    ('Waterloo, Ontario', 'Canada'),
+    ('Bavaria', 'Germany'),
+    ('Ontario', 'Canada'),
+    ('California', 'United States'),
+    ('Texas', 'United States'),
+    ('Remote, India', 'India; Remote'),
+    ('Remote (UK)', 'Remote; United Kingdom'),
+    ('Remote - London', 'Remote; United Kingdom'),
+    ('Hamburg', 'Germany'),
+    ('Frankfurt am Main, Germany', 'Germany'),
+    ('Lyon', 'France'),
+    ('Milan, Italy', 'Italy'),
+    ('Rome', 'Italy'),
+    ('Krakow, Poland', 'Poland'),
+    ('Wroclaw', 'Poland'),
+    ('Belgrade, Serbia', 'Serbia'),
+    ('Sofia, Bulgaria', 'Bulgaria'),
+    ('Tallinn, Estonia', 'Estonia'),
+    ('Vilnius, Lithuania', 'Lithuania'),
+    ('Riga, Latvia', 'Latvia'),
+    ('Reykjavik, Iceland', 'Iceland'),
+    # Two-letter words are US state codes unless a city in the location is in the country of that code
+    ('Berlin, DE', 'Germany'),
+    ('Wilmington, DE', 'United States'),
+    ('Toronto, CA', 'Canada'),
+    ('Bangalore, IN', 'India'),
+    ('Paris, TX', 'United States'),
+    ('Paris, FR', 'France'),
+]
+
+# Place names whose words also name other places
+OVERLAPPING_NAMES = [
+    ('Albuquerque, New Mexico', 'United States'),
+    ('Newark, New Jersey', 'United States'),
+    ('Hoboken, New Jersey', 'United States'),
+    ('Remote (NA)', 'Remote'),
+    ('Remote - NA', 'Remote'),
+    ('Cambridge, Massachusetts', 'United States'),
+    ('Wollongong, New South Wales', 'Australia'),
+    ('Montréal, Québec', 'Canada'),
+    ('Karnātaka', 'India'),
+    ('Zurich, CH', 'Switzerland'),
+]
+
+@pytest.mark.parametrize('location, expected', BOARD_LOCATIONS + OVERLAPPING_NAMES)
+def test_identify_country(location, expected):
+    assert identify_country(location) == expected
+
+def test_normalize_location_splits_remote_from_countries():
+    assert normalize_location('New York, NY; London, UK; Remote') == (('United Kingdom', 'United States'), True)
+    assert normalize_location('Remote - NA') == ((), True)
+    assert normalize_location('') == ((), False)
+
+def test_job_countries_indexes_remote_with_countries():
+    assert job_countries('Remote - Canada') == {'0': 'Canada', '1': 'Remote'}
+    assert job_countries('Headquarters') == {}
@@ -0,0 +1,139 @@
+"""SMTPPool against a local plain-SMTP stand-in on an ephemeral port"""
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from mailer import SMTPPool
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: accepts every message and records its recipients
+
+    Recipients containing 'refused' are rejected, a connection is closed
+    after server.drop_after messages and, if server.drop_on_mail is set,
+    as soon as a message is started.
+    """
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        sent = 0
+        recipients = []
+        self.reply('220 stand-in ESMTP')
+        for line in self.rfile:
+            command = line.decode().strip().upper()
+            if command.startswith('EHLO') or command.startswith('HELO'):
+                self.reply('250 stand-in')
+            elif command.startswith('MAIL'):
+                if server.drop_on_mail:
+                    return
+                recipients = []
+                self.reply('250 ok')
+            elif command.startswith('RCPT'):
+                if 'REFUSED' in command:
+                    self.reply('550 no such user')
+                else:
+                    recipients.append(command.split(':', 1)[1].strip('<> ').lower())
+                    self.reply('250 ok')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                with server.lock:
+                    server.delivered.extend(recipients)
+                sent += 1
+                self.reply('250 queued')
+                if server.drop_after and sent >= server.drop_after:
+                    return
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.delivered = []
+        self.drop_after = None
+        self.drop_on_mail = False
+
+@pytest.fixture
+def smtp_server():
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_pool(server, **kwargs):
+    host, port = server.server_address
+    return SMTPPool(host=host, port=port, starttls=False, timeout=5, **kwargs)
+
+def message(recipient):
+    msg = EmailMessage()
+    msg['From'] = 'alerts@example.com'
+    msg['To'] = recipient
+    msg['Subject'] = 'New jobs'
+    msg.set_content('hello')
+    return msg
+
+def test_connection_replaced_after_max_messages(smtp_server):
+    recipients = [f'user{number}@example.com' for number in range(12)]
+    with make_pool(smtp_server, size=1, max_messages=5) as pool:
+        for recipient in recipients:
+            pool.send(message(recipient))
+    assert smtp_server.delivered == recipients
+    assert pool.connections_opened == smtp_server.connections == 3
+
+def test_pool_shared_across_threads(smtp_server):
+    recipients = [f'user{number}@example.com' for number in range(40)]
+    with make_pool(smtp_server, size=2, max_messages=50) as pool:
+        threads = [threading.Thread(target=pool.send, args=(message(recipient),)) for recipient in recipients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sorted(smtp_server.delivered) == sorted(recipients)
+    assert smtp_server.connections <= 2
+
+def test_dropped_connection_reconnects_and_retries(smtp_server):
+    smtp_server.drop_after = 2
+    recipients = [f'user{number}@example.com' for number in range(5)]
+    with make_pool(smtp_server, size=1, max_messages=50) as pool:
+        for recipient in recipients:
+            pool.send(message(recipient))
+    # Every message is delivered once; the pool notices each drop on its next send
+    assert smtp_server.delivered == recipients
+    assert pool.connections_opened == 3
+
+def test_retries_only_once(smtp_server):
+    smtp_server.drop_on_mail = True
+    pool = make_pool(smtp_server, size=1)
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool.send(message('user@example.com'))
+    assert smtp_server.connections == 2
+    assert smtp_server.delivered == []
+    pool.close()
+
+def test_refused_recipient_not_retried(smtp_server):
+    with make_pool(smtp_server, size=1) as pool:
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            pool.send(message('refused@example.com'))
+        # The connection stays in the pool for the next message
+        pool.send(message('user@example.com'))
+    assert smtp_server.connections == 1
+    assert smtp_server.delivered == ['user@example.com']
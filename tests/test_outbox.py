@@ -0,0 +1,75 @@
+"""Outbox delivery across drains that fail part way"""
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+from outbox import OUTBOX_MAX_ATTEMPTS, Outbox
+
+class FlakyMailer:
+    """Accepts fail_after messages, then raises for every other one"""
+
+    dry_run = True
+
+    def __init__(self, fail_after=None, error=smtplib.SMTPServerDisconnected('Connection unexpectedly closed')):
+        self.fail_after = fail_after
+        self.error = error
+        self.recipients = []
+
+    def send(self, msg):
+        if self.fail_after is not None and len(self.recipients) >= self.fail_after:
+            raise self.error
+        self.recipients.append(msg['To'])
+
+def mime(recipient):
+    msg = EmailMessage()
+    msg['To'] = recipient
+    msg['Subject'] = 'New jobs'
+    msg.set_content('hello')
+    return msg.as_string()
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite'))
+    yield outbox
+    outbox.close()
+
+def rows(outbox):
+    return {recipient: (status, attempts)
+            for recipient, status, attempts in outbox.conn.execute('SELECT recipient, status, attempts FROM messages')}
+
+RECIPIENTS = [f'user{number}@example.com' for number in range(8)]
+
+def test_failed_messages_sent_once_on_next_drain(outbox):
+    assert outbox.enqueue((recipient, mime(recipient)) for recipient in RECIPIENTS) == len(RECIPIENTS)
+
+    first = FlakyMailer(fail_after=3)
+    assert outbox.drain(first, workers=1) == (3, 5)
+    assert first.recipients == RECIPIENTS[:3]
+    assert outbox.pending_count() == 5
+    assert {rows(outbox)[recipient] for recipient in RECIPIENTS[3:]} == {('pending', 1)}
+
+    second = FlakyMailer()
+    assert outbox.drain(second, workers=2) == (5, 0)
+    assert sorted(first.recipients + second.recipients) == sorted(RECIPIENTS)
+    assert {status for status, _ in rows(outbox).values()} == {'sent'}
+
+    # Nothing is left to send again
+    assert outbox.drain(FlakyMailer(), workers=2) == (0, 0)
+
+def test_message_failed_after_max_attempts(outbox):
+    outbox.enqueue([('user@example.com', mime('user@example.com'))])
+    for attempt in range(1, OUTBOX_MAX_ATTEMPTS + 1):
+        assert outbox.drain(FlakyMailer(fail_after=0), workers=1) == (0, 1)
+        expected = 'failed' if attempt == OUTBOX_MAX_ATTEMPTS else 'pending'
+        assert rows(outbox)['user@example.com'] == (expected, attempt)
+
+    mailer = FlakyMailer()
+    assert outbox.drain(mailer, workers=1) == (0, 0)
+    assert mailer.recipients == []
+
+def test_refused_recipient_failed_at_once(outbox):
+    outbox.enqueue([('refused@example.com', mime('refused@example.com'))])
+    refused = smtplib.SMTPRecipientsRefused({'refused@example.com': (550, b'no such user')})
+    assert outbox.drain(FlakyMailer(fail_after=0, error=refused), workers=1) == (0, 1)
+    assert rows(outbox)['refused@example.com'] == ('failed', 1)
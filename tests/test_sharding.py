@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from http_cache import ResponseCache
+from sharding import parse_shard_spec, read_shard_results, write_shard_results
+
+def test_parse_shard_spec_rejects_out_of_range():
+    assert parse_shard_spec('2/4') == (2, 4)
+    for spec in ('5/4', '0/4', 'x', '1/0'):
+        with pytest.raises(ValueError):
+            parse_shard_spec(spec)
+
+def test_shard_results_carry_fetched_validators(tmp_path):
+    cache = ResponseCache({'https://stale.example/': {'etag': 'old', 'body_hash': 'h0', 'last_used': 0}})
+    cache.store('https://one.example/', '"e1"', None, 'h1')
+    cache.store('https://two.example/', None, 'Mon, 01 Jan 2024 00:00:00 GMT', 'h2')
+    job = {'job_id': 'acme_1', 'updated_at': datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    write_shard_results(1, 2, [('greenhouse', job)], 1, cache.fetched_entries(), results_dir=str(tmp_path))
+    write_shard_results(2, 2, [], 0, {}, results_dir=str(tmp_path))
+
+    scraped, total_jobs_found, validators = read_shard_results(str(tmp_path))
+    assert scraped == [('greenhouse', job)]
+    assert total_jobs_found == 1
+    # Only boards fetched by the shard are handed over, not everything it had cached
+    assert set(validators) == {'https://one.example/', 'https://two.example/'}
+    assert validators['https://one.example/']['etag'] == '"e1"'
+
+    merged = ResponseCache()
+    merged.update(validators)
+    assert merged.conditional_headers('https://one.example/') == {'If-None-Match': '"e1"'}
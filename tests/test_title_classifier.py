@@ -0,0 +1,120 @@
+"""Role matcher equivalence: the compiled matchers against the old is_*_role chain
+
+The old scrapers checked one is_*_role function per role in provider order,
+each testing whether any of the role's keywords occurs in the lowercased
+title. reference_role_type is that chain with its keywords lowercased.
+"""
+import random
+
+import pytest
+
+from title_classifier import (
+    ASHBY_ROLE_ORDER, GREENHOUSE_ROLE_ORDER, ROLE_KEYWORDS, ashby_role_type, greenhouse_role_type,
+)
+
+PROFILES = [
+    ('greenhouse', GREENHOUSE_ROLE_ORDER, greenhouse_role_type),
+    ('ashby', ASHBY_ROLE_ORDER, ashby_role_type),
+]
+
+def reference_role_type(title, role_order):
+    title_lower = title.lower()
+    for role in role_order:
+        if any(keyword.lower() in title_lower for keyword in ROLE_KEYWORDS[role]):
+            return role
+    return None
+
+# (title, Greenhouse role, Ashby role)
+OVERLAPPING_TITLES = [
+    # 'devops engineer' is both swe and sre; swe comes first
+    ('DevOps Engineer', 'swe', 'swe'),
+    ('Senior DevOps Engineer, SRE', 'swe', 'swe'),
+    ('Site Reliability Engineer', 'sre', None),
+    ('SRE Engineer', 'sre', None),
+    # Keywords sharing a prefix: 'product analytics' / 'product analyst', 'data analytics' / 'data analyst'
+    ('Product Analytics Lead', 'data', 'data'),
+    ('Product Analyst', 'data', 'data'),
+    ('Data Analytics Manager', 'data', 'data'),
+    ('Staff Data Analyst', 'data', 'data'),
+    # Keywords that are prefixes of longer ones
+    ('UX Research Lead', 'uxresearcher', 'uxresearcher'),
+    ('Senior UX Researcher', 'uxresearcher', 'uxresearcher'),
+    ('Product Researcher', 'uxresearcher', 'uxresearcher'),
+    ('Product Management Intern', 'product', 'product'),
+    ('Technical Product Manager', 'product', 'product'),
+    ('UI/UX Designer', 'uidesigner', 'uidesigner'),
+    ('UI/UX Developer', 'uidesigner', 'uidesigner'),
+    # A later keyword in the title still loses to an earlier role
+    ('ML Engineer, Product Analytics', 'data', 'data'),
+    ('Product Manager, Data Analytics', 'product', 'product'),
+    # Keywords overlapping inside the title: 'business analytics' (bi) and 'analytics analyst' (data)
+    ('Business Analytics Analyst', 'data', 'data'),
+    ('Business Intelligence Analyst', 'bi', None),
+    # Roles only one provider classifies
+    ('Data Scientist', 'scientist', None),
+    ('Senior Data Engineer', 'dataeng', None),
+    ('Business Analyst', 'business', None),
+    ('Machine Learning Engineer', None, 'ml'),
+    ('AI Engineer, Platform', None, 'ml'),
+    # Mixed-case keywords in the tables
+    ('Insights Analyst', 'data', 'data'),
+    ('Power BI Developer', 'bi', None),
+    ('Account Executive', None, None),
+    ('', None, None),
+]
+
+# Titles as job boards write them, without overlapping keywords
+BOARD_TITLES = [
+    'Software Engineer, Backend', 'Senior Frontend Developer', 'Full Stack Engineer (Remote)',
+    'Program Manager, Trust & Safety', 'Technical Program Manager II', 'Programme Manager',
+    'Staff Machine Learning Engineer', 'Data Engineer - ETL', 'Cloud Engineer', 'Systems Engineer, Networking',
+    'Web Designer', 'Interaction Designer', 'Product Designer, Growth', 'User Researcher',
+    'Tableau Developer', 'BI Engineer', 'Data Visualization Specialist', 'Experimentation Analyst',
+    'Head of Product Management', 'Product Owner', 'Engineering Manager, Payments', 'Recruiter',
+    'Sr. Software Developer', 'ML Ops Engineer', 'Artificial Intelligence Engineer',
+]
+
+def keyword_titles(count, seed=0):
+    """Titles stitched from random keywords, fragments of keywords and filler words"""
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in ROLE_KEYWORDS.values() for keyword in keywords]
+    filler = ['senior', 'staff', ',', '-', 'ii', 'remote', '(', ')', 'and', '/']
+    titles = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            keyword = rng.choice(keywords)
+            if rng.random() < 0.3:
+                keyword = keyword[:rng.randint(1, len(keyword))]
+            parts.append(keyword if rng.random() < 0.5 else keyword.title())
+            if rng.random() < 0.5:
+                parts.append(rng.choice(filler))
+        titles.append(rng.choice([' ', '']).join(parts))
+    return titles
+
+def overlapping_keyword_titles():
+    """Every pair of keywords joined where the end of one is the start of the other, such as 'sretl engineer'"""
+    keywords = sorted({keyword.lower() for keywords in ROLE_KEYWORDS.values() for keyword in keywords})
+    return [
+        first + second[overlap:]
+        for first in keywords
+        for second in keywords
+        for overlap in range(1, min(len(first), len(second)))
+        if first.endswith(second[:overlap])
+    ]
+
+@pytest.mark.parametrize('title, greenhouse, ashby', OVERLAPPING_TITLES)
+def test_overlapping_keywords(title, greenhouse, ashby):
+    assert greenhouse_role_type(title) == greenhouse
+    assert ashby_role_type(title) == ashby
+
+@pytest.mark.parametrize('profile, role_order, match_role', PROFILES)
+def test_matches_reference_chain(profile, role_order, match_role):
+    titles = [title for title, _, _ in OVERLAPPING_TITLES] + BOARD_TITLES + overlapping_keyword_titles()
+    titles += keyword_titles(5000)
+    mismatches = [
+        (title, match_role(title), reference_role_type(title, role_order))
+        for title in titles
+        if match_role(title) != reference_role_type(title, role_order)
+    ]
+    assert mismatches == []
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from disk_cache import load_json, save_json
+
+# Keywords for each role type, matched case-insensitively anywhere in the title
+ROLE_KEYWORDS: Dict[str, List[str]] = {
+    'product': [
+        'product manager',
+        'product owner',
+        'technical product manager',
+        'product management',
+    ],
+    'program': [
+        'program manager',
+        'programme manager',
+        'technical program manager',
+        'program management',
+    ],
+    'data': [
+        'data analyst',
+        'analytics analyst',
+        'data analytics',
+        'insights analyst',
+        'product analyst',
+        'product insights analyst',
+        'product analytics',
+        'experimentation analyst',
+    ],
+    'business': [
+        'business analyst',
+    ],
+    'scientist': [
+        'data scientist',
+    ],
+    'bi': [
+        'business intelligence engineer',
+        'data visualization engineer',
+        'business intelligence analyst',
+        'data visualization analyst',
+        'tableau developer',
+        'power bi developer',
+        'data visualization specialist',
+        'tableau analyst',
+        'power bi analyst',
+        'tableau specialist',
+        'power bi specialist',
+        'bi analyst',
+        'bi engineer',
+        'data reporting analyst',
+        'business analytics',
+    ],
+    'dataeng': [
+        'data engineer',
+        'etl engineer',
+    ],
+    'swe': [
+        'software engineer',
+        'full stack engineer',
+        'backend engineer',
+        'frontend engineer',
+        'devops engineer',
+        'software developer',
+        'full stack developer',
+        'backend developer',
+        'frontend developer',
+        'web developer',
+        'cloud engineer',
+        'systems engineer',
+    ],
+    'sre': [
+        'sre engineer',
+        'site reliability engineer',
+        'site reliability',
+        'sre',
+        'devops engineer',
+    ],
+    'ml': [
+        'machine learning engineer',
+        'ml engineer',
+        'ml ops',
+        'artificial intelligence engineer',
+        'ai engineer',
+    ],
+    'uxresearcher': [
+        'ux researcher',
+        'ui researcher',
+        'user researcher',
+        'user experience researcher',
+        'user interface researcher',
+        'uxr',
+        'ux research',
+        'ui research',
+        'user research',
+        'product research',
+        'product researcher',
+    ],
+    'uidesigner': [
+        'user interface designer',
+        'ui designer',
+        'product designer',
+        'frontend designer',
+        'ux designer',
+        'interaction designer',
+        'ui/ux designer',
+        'ux/ ui designer',
+        'web designer',
+        'ui/ux developer',
+        'ux/ui developer',
+        'ui developer',
+        'ux developer',
+    ],
+}
+
+# Experience level keywords, checked in order: senior, then intern, then junior.
+# Each keyword is a whole word or phrase; punctuation is ignored, so 'sr'
+# matches "Sr." and "Sr", and 'co-op' matches "Co-op" and "Co op".
+SENIOR_KEYWORDS = {
+    'senior', 'lead', 'principal', 'staff', 'sr', 'head', 'chief',
+    'director', 'vp', 'vice president', 'engineering manager',
+}
+
+JUNIOR_KEYWORDS = {
+    'junior', 'jr', 'entry', 'associate', 'assistant',
+    'graduate', 'new grad', 'early career',
+}
+
+INTERN_KEYWORDS = {
+    'intern', 'interns', 'internship', 'internships', 'co-op', 'coop',
+    'student', 'students', 'apprentice', 'apprenticeship', 'trainee',
+    'fellow', 'fellows', 'fellowship',
+}
+
+# Role precedence per provider: the first role with a matching keyword wins
+GREENHOUSE_ROLE_ORDER = [
+    'product', 'program', 'data', 'business', 'scientist', 'bi',
+    'dataeng', 'swe', 'sre', 'uxresearcher', 'uidesigner',
+]
+ASHBY_ROLE_ORDER = [
+    'product', 'program', 'data', 'swe', 'ml', 'uxresearcher', 'uidesigner',
+]
+
+def trie_pattern(words: List[str]) -> str:
+    """Regex alternation of words factored into a prefix trie
+
+    The regex engine then branches on one character at a time instead of
+    trying every word in turn. At each position the longest word matches.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return build(trie)
+
+def compile_role_matcher(role_order: List[str]) -> Callable[[str], Optional[str]]:
+    """Compile the keywords of role_order into a single-pass role classifier
+
+    All keywords go into one trie-shaped regex wrapped in a lookahead, so a
+    single scan reports the longest keyword starting at every position,
+    overlapping ones included. Every shorter keyword that is a prefix of it
+    matches there too, so each keyword is ranked by the best role among its
+    prefixes. The best role over all positions is then the one the old
+    is_*_role chain returned.
+    """
+    keyword_roles: Dict[str, str] = {}
+    for role in role_order:
+        for keyword in ROLE_KEYWORDS[role]:
+            keyword_roles.setdefault(keyword.lower(), role)
+
+    precedence = {role: rank for rank, role in enumerate(role_order)}
+    keyword_ranks = {
+        keyword: min(precedence[role] for prefix, role in keyword_roles.items() if keyword.startswith(prefix))
+        for keyword in keyword_roles
+    }
+    pattern = re.compile('(?=(' + trie_pattern(list(keyword_roles)) + '))')
+
+    def match_role(title: str) -> Optional[str]:
+        if not title:
+            return None
+        best = None
+        for match in pattern.finditer(title.lower()):
+            rank = keyword_ranks[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return role_order[best] if best is not None else None
+
+    return match_role
+
+greenhouse_role_type = compile_role_matcher(GREENHOUSE_ROLE_ORDER)
+ashby_role_type = compile_role_matcher(ASHBY_ROLE_ORDER)
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+def tokenize_title(title: str) -> List[str]:
+    """Lowercase words of a title, with punctuation dropped"""
+    return _WORD_RE.findall(title.lower())
+
+def compile_experience_tables():
+    """Index the experience keywords by single word and by multi-word phrase
+
+    Returns (word ranks, phrase ranks, longest phrase length), where a rank
+    is the keyword's position in EXPERIENCE_LEVELS.
+    """
+    word_ranks: Dict[str, int] = {}
+    phrase_ranks: Dict[Tuple[str, ...], int] = {}
+    for rank, keywords in enumerate((SENIOR_KEYWORDS, INTERN_KEYWORDS, JUNIOR_KEYWORDS)):
+        for keyword in keywords:
+            words = tuple(tokenize_title(keyword))
+            table = word_ranks if len(words) == 1 else phrase_ranks
+            key = words[0] if len(words) == 1 else words
+            table[key] = min(rank, table.get(key, rank))
+    longest = max((len(phrase) for phrase in phrase_ranks), default=1)
+    return word_ranks, phrase_ranks, longest
+
+EXPERIENCE_LEVELS = ['senior', 'intern', 'junior']
+EXPERIENCE_WORD_RANKS, EXPERIENCE_PHRASE_RANKS, EXPERIENCE_PHRASE_LENGTH = compile_experience_tables()
+EXPERIENCE_PHRASE_STARTS = frozenset(phrase[0] for phrase in EXPERIENCE_PHRASE_RANKS)
+# Matches wherever a keyword's first word occurs as a substring, a superset of real matches
+EXPERIENCE_PREFILTER = re.compile(trie_pattern(
+    list(EXPERIENCE_WORD_RANKS) + list(EXPERIENCE_PHRASE_STARTS)
+))
+
+PROFILES = {
+    'greenhouse': greenhouse_role_type,
+    'ashby': ashby_role_type,
+}
+
+def get_experience_level(title: str) -> str:
+    """Determine experience level from the words of a job title"""
+    if not title:
+        return 'unknown'
+
+    title_lower = title.lower()
+    # Most titles contain no keyword at all; one regex scan rules them out before tokenizing
+    if not EXPERIENCE_PREFILTER.search(title_lower):
+        return 'mid-level'
+
+    words = _WORD_RE.findall(title_lower)
+    ranks = [EXPERIENCE_WORD_RANKS[word] for word in words if word in EXPERIENCE_WORD_RANKS]
+    for index, word in enumerate(words):
+        if word in EXPERIENCE_PHRASE_STARTS:
+            for length in range(2, EXPERIENCE_PHRASE_LENGTH + 1):
+                rank = EXPERIENCE_PHRASE_RANKS.get(tuple(words[index:index + length]))
+                if rank is not None:
+                    ranks.append(rank)
+
+    # Default to mid-level for ambiguous titles
+    return EXPERIENCE_LEVELS[min(ranks)] if ranks else 'mid-level'
+
+# Bump when classification logic changes without a keyword table change
+CLASSIFIER_VERSION = '2'
+
+TITLE_CACHE_FILE = 'title_cache.json'
+
+# In-process memo and on-disk cache sizes, in (profile, title) entries
+MEMO_SIZE = int(os.getenv('TITLE_MEMO_SIZE', '50000'))
+DISK_CACHE_SIZE = int(os.getenv('TITLE_CACHE_SIZE', '200000'))
+
+def tables_fingerprint() -> str:
+    """Hash of the keyword tables and precedence orders; any edit invalidates the disk cache"""
+    tables = {
+        'classifier': CLASSIFIER_VERSION,
+        'roles': ROLE_KEYWORDS,
+        'orders': {'greenhouse': GREENHOUSE_ROLE_ORDER, 'ashby': ASHBY_ROLE_ORDER},
+        'senior': sorted(SENIOR_KEYWORDS),
+        'junior': sorted(JUNIOR_KEYWORDS),
+        'intern': sorted(INTERN_KEYWORDS),
+    }
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and collapse its whitespace; titles with the same key classify the same"""
+    return ' '.join(title.lower().split()) if title else ''
+
+_memo: 'OrderedDict[str, Tuple[Optional[str], str]]' = OrderedDict()
+_disk_entries: Optional[Dict[str, List]] = None
+_cache_lock = threading.Lock()
+
+def _cache_key(profile: str, title_key: str) -> str:
+    return f"{profile}|{title_key}"
+
+def _load_disk_entries() -> Dict[str, List]:
+    global _disk_entries
+    if _disk_entries is None:
+        _disk_entries = load_json(TITLE_CACHE_FILE, tables_fingerprint())
+    return _disk_entries
+
+def classify_titles(titles: Iterable[str], profile: str = 'greenhouse') -> List[Tuple[Optional[str], str]]:
+    """Classify a batch of job titles into (role_type, experience_level) pairs
+
+    Results are memoized per normalized title, in a bounded in-process LRU
+    and in an on-disk cache that save_title_cache() persists between runs.
+
+    Args:
+        titles: Job titles, in any casing
+        profile: Role precedence to use, 'greenhouse' or 'ashby'
+    """
+    match_role = PROFILES[profile]
+    results = []
+    with _cache_lock:
+        disk_entries = _load_disk_entries()
+        for title in titles:
+            title_key = normalize_title(title)
+            key = _cache_key(profile, title_key)
+            result = _memo.get(key)
+            if result is not None:
+                _memo.move_to_end(key)
+            else:
+                cached = disk_entries.pop(key, None)
+                if cached is not None:
+                    result = (cached[0], cached[1])
+                else:
+                    result = (match_role(title_key), get_experience_level(title_key))
+                # Re-inserting keeps the disk cache ordered from least to most recently used
+                disk_entries[key] = list(result)
+                _memo[key] = result
+                if len(_memo) > MEMO_SIZE:
+                    _memo.popitem(last=False)
+            results.append(result)
+    return results
+
+def save_title_cache() -> None:
+    """Persist the most recently used classifications for the next run"""
+    with _cache_lock:
+        if _disk_entries is None:
+            return
+        entries = list(_disk_entries.items())[-DISK_CACHE_SIZE:]
+        save_json(TITLE_CACHE_FILE, dict(entries), tables_fingerprint())